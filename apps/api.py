@@ -1,31 +1,50 @@
 """FastAPI server for the RAG chatbot"""
+import asyncio
+import hashlib
 import logging
 import os
-import sys
 import uuid
-from fastapi import FastAPI, HTTPException
+import anyio
+import msgspec
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import uvicorn
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-from config import *
-from rag_system import RAGSystem
-from session_manager import SessionManager
-import utils
+from rag.config import (
+    DEFAULT_MAX_TOKENS, DEFAULT_TEMPERATURE, DEFAULT_TOP_P, RECENT_CONTEXT_EXCHANGES,
+    API_HOST, API_PORT, API_THREADPOOL_SIZE, HEALTH_CACHE_TTL, REDIS_URL, ARCHIVE_RECONCILE_INTERVAL,
+    LLM_CACHE_ENABLED, LLM_CACHE_NAME, LLM_CACHE_DISTANCE_THRESHOLD, LLM_CACHE_TTL,
+    LOG_LEVEL
+)
+from rag.rag_system import RAGSystem
+from rag.session_manager import AsyncSessionManager, SourceRecord
+from rag import utils
 
 # Setup logging
 utils.setup_logging(LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+# Optional imports
+try:
+    from redisvl.extensions.cache.llm import SemanticCache
+    from redisvl.query.filter import Tag
+    from redisvl.utils.vectorize import CustomTextVectorizer
+    LLM_CACHE_AVAILABLE = True
+except ImportError:
+    LLM_CACHE_AVAILABLE = False
+    logger.warning("redisvl not available - semantic LLM cache disabled")
+
 # Initialize FastAPI
 app = FastAPI(
     title="FlowHCM RAG Chatbot API",
     description="Local RAG chatbot with GPT-OSS-20B",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -37,9 +56,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global RAG system and session manager
+# Global RAG system, session manager and LLM cache
 rag_system: Optional[RAGSystem] = None
-session_manager: Optional[SessionManager] = None
+session_manager: Optional[AsyncSessionManager] = None
+llm_cache = None
+archive_reconcile_task: Optional[asyncio.Task] = None
 
 
 # Request/Response models
@@ -73,35 +94,190 @@ class SystemStatus(BaseModel):
     active_sessions: int
 
 
+def load_rag_system() -> RAGSystem:
+    """Create and initialize the RAG system"""
+    system = RAGSystem()
+    
+    if system.initialize():
+        logger.info("RAG system initialized successfully")
+    else:
+        logger.error("Failed to initialize RAG system")
+        raise Exception("RAG system initialization failed")
+    
+    return system
+
+
+# With PRELOAD=1 and gunicorn --preload, the master process loads the
+# embedding models, chunks and FAISS index once and forked workers share
+# those pages copy-on-write. Redis clients are still created per worker.
+if os.environ.get("PRELOAD") == "1":
+    logger.info("Preloading RAG system before workers fork")
+    rag_system = load_rag_system()
+    # The query encoder loads lazily; load it here too or every worker loads its own copy
+    rag_system.vector_store.encoder
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG system and session manager on startup"""
-    global rag_system, session_manager
+    global rag_system, session_manager, llm_cache, archive_reconcile_task
     logger.info("="*60)
     logger.info("Starting FastAPI server")
     logger.info("="*60)
     
+    # Size the threadpool that runs blocking RAG calls
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    logger.info(f"Threadpool size: {API_THREADPOOL_SIZE}")
+    
     try:
         # Initialize session manager
         logger.info("Initializing Redis session manager")
-        session_manager = SessionManager()
-        logger.info(f"Active sessions: {session_manager.get_session_count()}")
+        session_manager = AsyncSessionManager()
+        await session_manager.connect()
+        await session_manager.migrate_legacy_sessions()
+        logger.info(f"Active sessions: {await session_manager.get_session_count()}")
+        logger.info(f"Archived sessions: {await session_manager.rebuild_archive_index()}")
+        archive_reconcile_task = asyncio.create_task(reconcile_archive_index())
         
-        # Initialize RAG system
-        rag_system = RAGSystem()
-        success = rag_system.initialize()
+        # Initialize RAG system (unless it was preloaded before fork)
+        if rag_system is None:
+            rag_system = load_rag_system()
         
-        if success:
-            logger.info("RAG system initialized successfully")
-        else:
-            logger.error("Failed to initialize RAG system")
-            raise Exception("RAG system initialization failed")
+        # Precompute the /documents response
+        build_documents_payload()
+        
+        # Initialize semantic LLM cache
+        llm_cache = create_llm_cache()
+        if llm_cache is not None and rag_system.response_cache is not None:
+            # The shared Redis cache replaces the per-process one - checking both
+            # would run two similarity lookups with different thresholds per query
+            rag_system.response_cache = None
+            logger.info("In-process response cache disabled in favour of the Redis LLM cache")
     
     except Exception as e:
         logger.error(f"Startup error: {e}", exc_info=True)
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work and release Redis connections"""
+    logger.info("Shutting down FastAPI server")
+    
+    if archive_reconcile_task is not None:
+        archive_reconcile_task.cancel()
+    
+    if session_manager is not None:
+        await session_manager.close()
+    
+    if rag_system is not None:
+        await run_in_threadpool(rag_system.save_caches)
+
+
+def build_documents_payload():
+    """Encode the /documents response once - call again whenever the corpus is reloaded"""
+    docs = [
+        {
+            "name": doc["name"],
+            "type": doc["type"],
+            "size": doc["size"]
+        }
+        for doc in rag_system.documents
+    ]
+    
+    payload = orjson.dumps({"documents": docs, "count": len(docs)})
+    app.state.documents_payload = payload
+    app.state.documents_etag = f'"{hashlib.md5(payload).hexdigest()}"'
+
+
+async def reconcile_archive_index():
+    """Periodically rebuild the archive index from disk"""
+    while True:
+        await asyncio.sleep(ARCHIVE_RECONCILE_INTERVAL)
+        try:
+            await session_manager.rebuild_archive_index()
+        except Exception as e:
+            logger.warning(f"Archive index reconcile failed: {e}")
+
+
+def create_llm_cache():
+    """Create the Redis semantic cache, embedding prompts with the retrieval encoder"""
+    if not LLM_CACHE_ENABLED:
+        logger.warning("Semantic LLM cache disabled by LLM_CACHE_ENABLED")
+        return None
+    if not LLM_CACHE_AVAILABLE:
+        logger.warning("Semantic LLM cache disabled - install redisvl>=0.5.0 to enable it")
+        return None
+    
+    vector_store = rag_system.vector_store
+    try:
+        cache = SemanticCache(
+            name=LLM_CACHE_NAME,
+            redis_url=REDIS_URL,
+            distance_threshold=LLM_CACHE_DISTANCE_THRESHOLD,
+            ttl=LLM_CACHE_TTL,
+            vectorizer=CustomTextVectorizer(
+                # Resolved per call - the encoder is loaded lazily on first use
+                embed=lambda text: vector_store.encoder.encode(text, normalize_embeddings=True).tolist()
+            ),
+            filterable_fields=[{"name": "scope", "type": "tag"}]
+        )
+        logger.info(f"Semantic LLM cache ready: {LLM_CACHE_NAME}")
+        return cache
+    except Exception as e:
+        logger.warning(f"Failed to initialize semantic LLM cache: {e}")
+        return None
+
+
+def get_cache_scope(request: QueryRequest, recent_context: str) -> str:
+    """Hash everything besides the query text that shapes the response"""
+    scope = (
+        f"{rag_system.corpus_version}|{recent_context}|"
+        f"{request.max_tokens}|{request.temperature}|{request.top_p}"
+    )
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()
+
+
+def _cache_vector(query_embedding) -> Optional[List[float]]:
+    """Reuse the retrieval embedding so the cache doesn't encode the query again"""
+    return query_embedding[0].tolist() if query_embedding is not None else None
+
+
+def lookup_cached_response(query: str, scope: str, query_embedding=None) -> Optional[dict]:
+    """Return the closest cached response for this query and scope, if any"""
+    try:
+        hits = llm_cache.check(
+            prompt=query,
+            vector=_cache_vector(query_embedding),
+            num_results=1,
+            filter_expression=Tag("scope") == scope
+        )
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+        return None
+    return hits[0] if hits else None
+
+
+def store_cached_response(
+    query: str,
+    scope: str,
+    response: str,
+    sources_data: List[SourceRecord],
+    query_embedding=None
+):
+    """Store a generated response in the semantic cache"""
+    try:
+        llm_cache.store(
+            prompt=query,
+            response=response,
+            vector=_cache_vector(query_embedding),
+            metadata={"sources": msgspec.to_builtins(sources_data)},
+            filters={"scope": scope}
+        )
+    except Exception as e:
+        logger.warning(f"Semantic cache store failed: {e}")
+
+
 @app.get("/", response_model=dict)
 async def root():
     """Root endpoint"""
@@ -121,7 +297,7 @@ async def health_check():
     redis_connected = True
     active_sessions = 0
     try:
-        active_sessions = session_manager.get_session_count()
+        active_sessions = await session_manager.get_session_count_cached(HEALTH_CACHE_TTL)
     except:
         redis_connected = False
     
@@ -147,39 +323,55 @@ async def query(request: QueryRequest):
     logger.info(f"API query received: '{request.query}' [Session: {session_id}]")
     
     try:
-        # Get session history for context
-        recent_context = session_manager.get_recent_context(session_id, RECENT_CONTEXT_EXCHANGES)
-        
-        # Process query with RAG system
-        response, sources = rag_system.query_with_context(
-            request.query,
-            recent_context,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature,
-            top_p=request.top_p
+        # Load session history while the query is embedded
+        recent_context, query_embedding = await asyncio.gather(
+            session_manager.get_recent_context(session_id, RECENT_CONTEXT_EXCHANGES),
+            run_in_threadpool(rag_system.embed_query, request.query)
         )
         
-        # Convert sources to serializable format
-        sources_data = [
-            {
-                "content": doc.content,
-                "source_file": doc.source_file,
-                "chunk_id": doc.chunk_id,
-                "relevance_score": doc.relevance_score
-            }
-            for doc in sources
-        ]
+        # Check the semantic cache before running the RAG pipeline
+        cached = None
+        if llm_cache is not None:
+            cache_scope = get_cache_scope(request, recent_context)
+            cached = await run_in_threadpool(
+                lookup_cached_response, request.query, cache_scope, query_embedding
+            )
+        
+        if cached:
+            logger.info(f"Semantic cache hit [Session: {session_id}]")
+            response = cached["response"]
+            sources_data = (cached.get("metadata") or {}).get("sources", [])
+        else:
+            # Process query with RAG system (off the event loop)
+            response, sources, failed = await run_in_threadpool(
+                rag_system.query_with_context,
+                request.query,
+                recent_context,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                top_p=request.top_p,
+                query_embedding=query_embedding
+            )
+            
+            # Session manager encodes these structs directly
+            sources_data = [SourceRecord.from_chunk(doc) for doc in sources]
+            
+            # Error replies (Ollama down, timeouts) would otherwise be replayed for LLM_CACHE_TTL
+            if llm_cache is not None and not failed:
+                await run_in_threadpool(
+                    store_cached_response, request.query, cache_scope, response, sources_data,
+                    query_embedding
+                )
         
         # Save to session
-        session_manager.add_message(session_id, "user", request.query, sources_data)
-        session_manager.add_message(session_id, "assistant", response)
+        await session_manager.add_exchange(session_id, request.query, response, sources_data)
         
-        logger.info(f"Query processed [Session: {session_id}] (used {len(sources)} sources)")
+        logger.info(f"Query processed [Session: {session_id}] (used {len(sources_data)} sources)")
         
         return QueryResponse(
             session_id=session_id,
             response=response,
-            sources_count=len(sources)
+            sources_count=len(sources_data)
         )
     
     except Exception as e:
@@ -193,31 +385,31 @@ async def clear_conversation(session_id: str):
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    if not session_manager.session_exists(session_id):
+    if not await session_manager.session_exists(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session_manager.clear_session(session_id)
+    await session_manager.clear_session(session_id)
     logger.info(f"Conversation cleared for session: {session_id}")
     
     return {"message": "Conversation history cleared", "session_id": session_id}
 
 
 @app.get("/documents")
-async def list_documents():
-    """List loaded documents"""
+async def list_documents(request: Request):
+    """List loaded documents (served from a precomputed payload with an ETag)"""
     if rag_system is None:
         raise HTTPException(status_code=503, detail="RAG system not initialized")
     
-    docs = [
-        {
-            "name": doc["name"],
-            "type": doc["type"],
-            "size": len(doc["content"])
-        }
-        for doc in rag_system.documents
-    ]
+    etag = app.state.documents_etag
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    return {"documents": docs, "count": len(docs)}
+    return Response(
+        app.state.documents_payload,
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 
 @app.get("/sessions")
@@ -226,7 +418,7 @@ async def list_sessions():
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    active_sessions = session_manager.get_active_sessions()
+    active_sessions = await session_manager.get_active_sessions()
     return {
         "active_sessions": active_sessions,
         "count": len(active_sessions)
@@ -239,11 +431,12 @@ async def get_session_info(session_id: str):
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    session_data = session_manager.get_session(session_id)
+    session_data = await session_manager.get_session(session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return session_data
+    # Already plain JSON types - skip FastAPI's jsonable_encoder pass
+    return ORJSONResponse(session_data)
 
 
 @app.post("/session/{session_id}/end")
@@ -252,14 +445,15 @@ async def end_session(session_id: str):
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    if not session_manager.session_exists(session_id):
+    if not await session_manager.session_exists(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    if session_manager.end_session(session_id):
+    if await session_manager.end_session(session_id):
+        # The archive file is written in the background after this returns
         return {
-            "message": "Session ended and archived",
+            "message": "Session ended, archive queued",
             "session_id": session_id,
-            "archived": True
+            "archive_status": "archive_queued"
         }
     else:
         raise HTTPException(status_code=500, detail="Failed to end session")
@@ -271,14 +465,15 @@ async def end_session_get(session_id: str):
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    if not session_manager.session_exists(session_id):
+    if not await session_manager.session_exists(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    if session_manager.end_session(session_id):
+    if await session_manager.end_session(session_id):
+        # The archive file is written in the background after this returns
         return {
-            "message": "Session ended and archived",
+            "message": "Session ended, archive queued",
             "session_id": session_id,
-            "archived": True
+            "archive_status": "archive_queued"
         }
     else:
         raise HTTPException(status_code=500, detail="Failed to end session")
@@ -290,11 +485,11 @@ async def delete_session(session_id: str, archive: bool = True):
     if session_manager is None:
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
-    if session_manager.delete_session(session_id, archive=archive):
+    if await session_manager.delete_session(session_id, archive=archive):
         return {
             "message": "Session deleted",
             "session_id": session_id,
-            "archived": archive
+            "archive_status": "archive_queued" if archive else "not_archived"
         }
     else:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -307,11 +502,7 @@ async def list_archives():
         raise HTTPException(status_code=503, detail="Session manager not initialized")
     
     try:
-        archive_files = [
-            f for f in os.listdir(session_manager.archive_folder)
-            if f.startswith("session_") and f.endswith(".json")
-        ]
-        archive_files.sort(reverse=True)  # Most recent first
+        archive_files = await session_manager.list_archives()  # Most recent first
         
         return {
             "archives": archive_files,
@@ -330,15 +521,11 @@ async def get_archive(filename: str):
     
     filepath = os.path.join(session_manager.archive_folder, filename)
     
-    if not os.path.exists(filepath):
+    if os.path.basename(filename) != filename or not os.path.isfile(filepath):
         raise HTTPException(status_code=404, detail="Archive not found")
     
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Archives are already JSON on disk - send the bytes as-is
+    return FileResponse(filepath, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -348,5 +535,8 @@ if __name__ == "__main__":
         host=API_HOST,
         port=API_PORT,
         reload=False,
+        # "auto" picks uvloop/httptools when installed (not on Windows) and falls back otherwise
+        loop="auto",
+        http="auto",
         log_level="info"
     )
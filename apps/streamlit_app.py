@@ -1,17 +1,20 @@
 """Streamlit UI for the RAG chatbot"""
 import streamlit as st
+import atexit
+import html
 import logging
 import os
-import sys
+import threading
+import time
 import uuid
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-from config import *
-from rag_system import RAGSystem
-from session_manager import SessionManager
-import utils
+from rag.config import (
+    DOCS_FOLDER, DEFAULT_MAX_TOKENS, DEFAULT_TEMPERATURE, DEFAULT_TOP_P,
+    RECENT_CONTEXT_EXCHANGES, SOURCE_PREVIEW_CHARS, DOCS_RELOAD_INTERVAL, LOG_LEVEL
+)
+from rag.rag_system import RAGSystem
+from rag.session_manager import SessionManager, SourceRecord
+from rag import utils
 
 # Setup logging
 utils.setup_logging(LOG_LEVEL)
@@ -30,6 +33,67 @@ logger.info("FlowHCM Chatbot Starting Up")
 logger.info("="*60)
 
 
+def docs_manifest(rag_system: RAGSystem) -> tuple:
+    """Cheap (path, mtime) snapshot of the docs folder - changes whenever a file does"""
+    return tuple((p, os.path.getmtime(p)) for p in rag_system.doc_processor.list_files())
+
+
+@st.cache_resource
+def corpus_reload_state() -> dict:
+    """When the docs folder was last checked, plus a lock so only one session reloads at a time"""
+    return {"checked_at": time.monotonic(), "lock": threading.Lock()}
+
+
+def refresh_corpus(rag_system: RAGSystem, force: bool = False) -> bool:
+    """Reload the corpus if the docs folder changed, checking at most every DOCS_RELOAD_INTERVAL seconds"""
+    state = corpus_reload_state()
+    if not force and time.monotonic() - state["checked_at"] < DOCS_RELOAD_INTERVAL:
+        return False
+    
+    # Another session is already checking or reloading
+    if not state["lock"].acquire(blocking=False):
+        return False
+    try:
+        state["checked_at"] = time.monotonic()
+        manifest = docs_manifest(rag_system)
+        if manifest == rag_system.corpus_manifest:
+            return False
+        
+        logger.info("Docs folder changed - reloading corpus")
+        with st.spinner("Reloading documentation..."):
+            # Other sessions keep querying the current corpus until set_corpus swaps in the new one
+            if not rag_system.set_corpus(*rag_system.read_corpus()):
+                return False
+        rag_system.corpus_manifest = manifest
+        return True
+    finally:
+        state["lock"].release()
+
+
+@st.cache_data
+def render_doc_list_html(doc_digests: tuple) -> str:
+    """Build the sidebar document list once per document set"""
+    items = []
+    for name, doc_type, size, preview in doc_digests:
+        items.append(
+            f"<details><summary>📄 {html.escape(name)}</summary>"
+            f"<p><b>Type:</b> {html.escape(doc_type)}<br><b>Size:</b> {size} chars</p>"
+            f"<pre style=\"white-space: pre-wrap\"><code>{html.escape(preview)}</code></pre>"
+            f"</details>"
+        )
+    return "\n".join(items)
+
+
+def render_source_content(content: str, key: str):
+    """Show a bounded preview of a source chunk, with the full text behind a checkbox"""
+    if len(content) <= SOURCE_PREVIEW_CHARS:
+        st.code(content, language=None)
+    elif st.checkbox("Show full", key=key):
+        st.code(content, language=None)
+    else:
+        st.code(content[:SOURCE_PREVIEW_CHARS] + "...[truncated]", language=None)
+
+
 @st.cache_resource
 def load_system():
     """Load the RAG system and session manager"""
@@ -47,6 +111,7 @@ def load_system():
             # Initialize session manager
             try:
                 session_manager = SessionManager()
+                session_manager.migrate_legacy_sessions()
                 logger.info("Session manager initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize session manager: {e}")
@@ -56,10 +121,14 @@ def load_system():
             
             # Initialize RAG system
             rag_system = RAGSystem()
+            manifest = docs_manifest(rag_system)
             success = rag_system.initialize()
+            rag_system.corpus_manifest = manifest
             
             if success:
                 logger.info("RAG system loaded successfully")
+                # Persist the response cache when the server exits
+                atexit.register(rag_system.save_caches)
                 st.success(f"✅ Loaded {len(rag_system.documents)} documents with {len(rag_system.chunks)} chunks")
                 if session_manager:
                     st.success(f"✅ Redis connected - {session_manager.get_session_count()} active sessions")
@@ -87,6 +156,9 @@ def main():
     if rag_system is None:
         return
     
+    # Pick up added/edited docs periodically; unchanged manifests reuse the cached corpus
+    refresh_corpus(rag_system)
+    
     # Initialize session ID in Streamlit session state
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
@@ -98,15 +170,23 @@ def main():
         
         # Show documents
         if rag_system.documents:
-            for doc in rag_system.documents:
-                with st.expander(f"📄 {doc['name']}"):
-                    st.write(f"**Type:** {doc['type']}")
-                    st.write(f"**Size:** {len(doc['content'])} chars")
-                    preview = doc['content'][:200] + "..." if len(doc['content']) > 200 else doc['content']
-                    st.code(preview, language=doc['type'])
+            # Size and preview are precomputed when documents are loaded
+            doc_digests = tuple(
+                (doc['name'], doc['type'], doc['size'], doc['preview'])
+                for doc in rag_system.documents
+            )
+            st.markdown(render_doc_list_html(doc_digests), unsafe_allow_html=True)
         else:
             st.info("No documents loaded")
         
+        if st.button("🔄 Reload Documents", use_container_width=True):
+            if refresh_corpus(rag_system, force=True):
+                st.rerun()
+            elif corpus_reload_state()["lock"].locked():
+                st.info("A reload is already in progress - try again in a moment")
+            else:
+                st.info("Documents are up to date")
+        
         st.markdown("---")
         
         # Settings
@@ -123,8 +203,8 @@ def main():
         st.info(f"**Documents:** {len(rag_system.documents)}")
         st.info(f"**Chunks:** {len(rag_system.chunks)}")
         
-        if rag_system.vector_store.index:
-            st.success(f"✅ **Vector Search:** {rag_system.vector_store.index.ntotal} embeddings")
+        if rag_system.retriever is not None:
+            st.success(f"✅ **Vector Search:** {rag_system.retriever.search_index.index.ntotal} embeddings")
         else:
             st.warning("⚠️ **Vector Search:** Not available")
         
@@ -148,7 +228,7 @@ def main():
             logger.info("Ending session")
             if session_manager:
                 session_manager.end_session(st.session_state.session_id)
-                st.success("Session ended and archived!")
+                st.success("Session ended - saving its archive in the background")
                 # Generate new session
                 st.session_state.session_id = str(uuid.uuid4())
                 st.session_state.messages = []
@@ -174,7 +254,7 @@ def main():
             st.session_state.messages = []
     
     # Display chat history
-    for message in st.session_state.messages:
+    for msg_idx, message in enumerate(st.session_state.messages):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
             
@@ -186,14 +266,7 @@ def main():
                         st.markdown(f"**Chunk ID:** {source.chunk_id}")
                         st.markdown(f"**Length:** {len(source.content)} characters")
                         # Unique key using message index and source index
-                        msg_idx = st.session_state.messages.index(message)
-                        st.text_area(
-                            f"Full Content - Source {i}", 
-                            source.content, 
-                            height=300, 
-                            disabled=True,
-                            key=f"history_source_{msg_idx}_{i}"
-                        )
+                        render_source_content(source.content, key=f"history_source_{msg_idx}_{i}")
                         st.markdown("---")
     
     # Chat input
@@ -216,48 +289,45 @@ def main():
                         st.session_state.session_id, 
                         RECENT_CONTEXT_EXCHANGES
                     )
-                    response, context_docs = rag_system.query_with_context(
+                    stream, context_docs = rag_system.query_stream_with_context(
                         prompt,
                         recent_context,
                         max_tokens=max_tokens,
                         temperature=temperature,
                         top_p=top_p
                     )
-                    
-                    # Save to Redis
-                    sources_data = [
-                        {
-                            "content": doc.content,
-                            "source_file": doc.source_file,
-                            "chunk_id": doc.chunk_id,
-                            "relevance_score": doc.relevance_score
-                        }
-                        for doc in context_docs
-                    ]
-                    session_manager.add_message(st.session_state.session_id, "user", prompt, sources_data)
-                    session_manager.add_message(st.session_state.session_id, "assistant", response)
                 else:
-                    # Use internal RAG system history
-                    response, context_docs = rag_system.query(
+                    # Use internal RAG system history (saved when the stream finishes)
+                    stream, context_docs = rag_system.query_stream(
                         prompt,
                         max_tokens=max_tokens,
                         temperature=temperature,
                         top_p=top_p
                     )
-                
-                logger.info(f"Response generated: {len(response)} chars, {len(context_docs)} sources")
-                
-                st.markdown(response)
-                
-                # Show sources
-                if context_docs:
-                    with st.expander(f"📚 Sources ({len(context_docs)})"):
-                        for i, doc in enumerate(context_docs, 1):
-                            st.markdown(f"**{i}. {doc.source_file}** (score: {doc.relevance_score:.3f})")
-                            st.markdown(f"**Chunk ID:** {doc.chunk_id}")
-                            st.markdown(f"**Length:** {len(doc.content)} characters")
-                            st.text_area(f"Full Content - Source {i}", doc.content, height=300, disabled=True)
-                            st.markdown("---")
+            
+            # The stream is already cleaned, so what renders is what gets saved
+            streamed = st.write_stream(stream)
+            response = streamed if isinstance(streamed, str) else ""
+            
+            if session_manager:
+                # Save both messages to Redis with a single write
+                sources_data = [SourceRecord.from_chunk(doc) for doc in context_docs]
+                session_manager.add_exchange(st.session_state.session_id, prompt, response, sources_data)
+            
+            logger.info(f"Response generated: {len(response)} chars, {len(context_docs)} sources")
+            
+            # Show sources
+            if context_docs:
+                with st.expander(f"📚 Sources ({len(context_docs)})"):
+                    for i, doc in enumerate(context_docs, 1):
+                        st.markdown(f"**{i}. {doc.source_file}** (score: {doc.relevance_score:.3f})")
+                        st.markdown(f"**Chunk ID:** {doc.chunk_id}")
+                        st.markdown(f"**Length:** {len(doc.content)} characters")
+                        # Same key this message gets in the history loop, so the toggle survives reruns
+                        render_source_content(
+                            doc.content, key=f"history_source_{len(st.session_state.messages)}_{i}"
+                        )
+                        st.markdown("---")
         
         # Add to session state
         st.session_state.messages.append({
@@ -0,0 +1,100 @@
+"""Configuration settings for the RAG chatbot"""
+import os
+
+# Project root holding docs/, data/ and session_archives/: RAG_PROJECT_ROOT if set, else the
+# checkout this package lives in (src/rag/ -> repo root), else the working directory (installed copy)
+_CHECKOUT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.environ.get("RAG_PROJECT_ROOT") or (
+    _CHECKOUT_ROOT if os.path.exists(os.path.join(_CHECKOUT_ROOT, "pyproject.toml")) else os.getcwd()
+)
+
+# Model settings
+MODEL_NAME = "gpt-oss:20b"  # Ollama model name - local version
+OLLAMA_BASE_URL = "http://localhost:11434"  # Ollama API endpoint
+EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
+
+# Document settings
+DOCS_FOLDER = os.path.join(PROJECT_ROOT, "docs")
+SEMANTIC_SIMILARITY_THRESHOLD = 0.7  # Lower = more chunks, Higher = fewer chunks
+CHUNK_SIMILARITY_WINDOW = 2  # Sentences averaged on each side of a boundary (1 = adjacent only)
+CHUNKER_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"  # int8 ONNX chunker encoder (None = PyTorch fp32)
+DOC_PREVIEW_CHARS = 200  # Characters shown in document previews
+SOURCE_PREVIEW_CHARS = 2000  # Characters of a source chunk shown before "Show full"
+DOCS_RELOAD_INTERVAL = 30  # Seconds between Streamlit checks of the docs folder for changes
+
+# Vector store settings
+FAISS_INDEX_FILE = os.path.join(PROJECT_ROOT, "data", "faiss_index.bin")
+CHUNKS_FILE = os.path.join(PROJECT_ROOT, "data", "document_chunks.pkl")
+FAISS_INDEX_TYPE = "HNSW32,SQ8"  # faiss.index_factory string for large corpora (SQ8 = int8 vectors, 4x smaller), e.g. "IVF{nlist},PQ{m}"
+FAISS_REFINE_K_FACTOR = 4  # With a ",RFlat" suffix: candidates re-ranked with FP32 vectors per result
+FAISS_NLIST_SEARCH = 16  # IVF lists probed per query (higher = better recall, slower)
+FAISS_HNSW_EF_CONSTRUCTION = 200  # HNSW build-time neighbour candidates
+FAISS_HNSW_EF_SEARCH = 64  # HNSW query-time candidates (higher = better recall, slower)
+FAISS_MIN_VECTORS_FOR_INDEX = 20000  # Below this many chunks, use exact flat search
+USE_GPU_FAISS = False  # Search on GPU (needs faiss-gpu; HNSW indexes stay on CPU - use Flat or IVF types)
+QUERY_BATCH_SIZE = 32  # Max concurrent queries encoded together (1 = no batching)
+QUERY_BATCH_WAIT = 0.005  # Seconds a batch waits for more queries, only while others are already queued
+EMBEDDING_CACHE_FILE = os.path.join(PROJECT_ROOT, "data", "embedding_cache.pkl")  # Query + chunk embeddings keyed by text hash
+EMBEDDING_CACHE_MAX_QUERIES = 10000  # Query embeddings kept (least recently used evicted first)
+CHUNK_CACHE_DIR = os.path.join(PROJECT_ROOT, "data")  # Cached documents + chunks keyed by docs manifest
+
+# Generation settings
+DEFAULT_MAX_TOKENS = 750
+DEFAULT_TEMPERATURE = 0.2
+DEFAULT_TOP_P = 0.7
+DEFAULT_TOP_K = 20
+REPETITION_PENALTY = 1.2
+NO_REPEAT_NGRAM_SIZE = 3
+OLLAMA_TIMEOUT = 120  # Timeout in seconds for Ollama API requests (max time to wait for response)
+OLLAMA_KEEP_ALIVE = "30m"  # How long Ollama keeps the model (and its KV cache) loaded after each request (-1 = forever)
+
+# RAG settings
+TOP_K_RETRIEVAL = 10
+TOP_K_CONTEXT = 7  # Use top 7 most relevant chunks for context
+MIN_RELEVANCE_THRESHOLD = 0.6
+
+# Semantic response cache settings (in-process, used by RAGSystem)
+# Serves the Streamlit app; the API swaps it for the shared Redis LLM cache below when that is available
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_THRESHOLD = 0.97  # Min cosine similarity between queries for a hit
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_FILE = os.path.join(
+    PROJECT_ROOT, "data", f"response_cache_{MODEL_NAME.replace(':', '_').replace('/', '_')}.pkl"
+)
+
+# Conversation settings
+MAX_HISTORY = 5
+RECENT_CONTEXT_EXCHANGES = 5
+
+# API settings
+API_HOST = "0.0.0.0"
+API_PORT = 8000
+API_THREADPOOL_SIZE = 40  # Max concurrent blocking RAG calls per worker
+HEALTH_CACHE_TTL = 5  # Seconds /health reuses the active session count
+
+# Redis settings (Session Management)
+REDIS_HOST = "localhost"
+REDIS_PORT = 6379
+REDIS_DB = 0
+REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+SESSION_EXPIRY_SECONDS = 1800  # 30 minutes, refreshed on every session read/write
+REDIS_MAX_CONNECTIONS = 64  # Connection pool size per API worker
+REDIS_SOCKET_TIMEOUT = 2.0  # Seconds to wait on a Redis command
+REDIS_HEALTH_CHECK_INTERVAL = 30  # Seconds before an idle connection is re-checked
+
+# Semantic LLM cache settings (RedisVL, shared by all API workers)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_NAME = "rag_llm_cache"
+LLM_CACHE_DISTANCE_THRESHOLD = 0.1  # Cosine distance - lower = stricter matching
+LLM_CACHE_TTL = 3600  # Seconds a cached response stays valid
+
+# Session Archive settings
+ARCHIVE_FOLDER = os.path.join(PROJECT_ROOT, "session_archives")
+ARCHIVE_FORMAT = "json"  # json or txt
+ARCHIVE_INDEX_KEY = "archives:index"  # Redis sorted set of archive filenames by time
+ARCHIVE_INDEX_MAX_ENTRIES = 10000  # Newest archives kept in the index (0 = unbounded)
+ARCHIVE_RECONCILE_INTERVAL = 300  # Seconds between archive index rebuilds from disk
+
+# Logging settings
+LOG_LEVEL = "INFO"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -1,5 +1,5 @@
 """LLM generation components"""
-from .llm_engine import LLMEngine
+from .llm_engine import LLMEngine, StreamStatus
 from .prompts import (
     get_general_prompt,
     get_document_aware_prompt
@@ -7,6 +7,7 @@ from .prompts import (
 
 __all__ = [
     "LLMEngine",
+    "StreamStatus",
     "get_general_prompt",
     "get_document_aware_prompt"
 ]
@@ -0,0 +1,364 @@
+"""LLM engine for text generation using Ollama"""
+import logging
+import os
+import re
+from typing import Dict, Iterator, Optional, Tuple
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import OLLAMA_TIMEOUT, OLLAMA_KEEP_ALIVE
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.warning("pyahocorasick not available - using regex stop-string matching")
+
+# Every error reply starts with this
+LLM_ERROR_PREFIX = "I apologize, but"
+
+# Stop strings to prevent continuation
+STOP_STRINGS = [
+    "USER QUESTION",
+    "QUESTION",
+    "ANSWER:",
+    "YOUR RESPONSE",
+    "USER QUESTIONS",
+    "\n\nHow do",
+    "\n\nWhat is",
+    "\n\nCan I",
+    "\n\nWhere can",
+    "\n\nIs there",
+    "\n\nAre there",
+    "\nRemember,",
+    "what if i",
+    "what if you"
+]
+
+# Streamed text is held back by this much so a partial stop string is never shown
+_STOP_HOLDBACK = max(len(s) for s in STOP_STRINGS) - 1
+
+# Single-pass matcher for all stop strings (regex alternation if pyahocorasick is missing)
+if AHOCORASICK_AVAILABLE:
+    _STOP_AUTOMATON = ahocorasick.Automaton()
+    for _stop_str in STOP_STRINGS:
+        _STOP_AUTOMATON.add_word(_stop_str, _stop_str)
+    _STOP_AUTOMATON.make_automaton()
+else:
+    _STOP_RE = re.compile("|".join(re.escape(s) for s in STOP_STRINGS))
+
+# Best prefix token count seen per (base_url, model, prefix) - outlives engines rebuilt in this process
+_PREFIX_TOKENS: Dict[Tuple[str, str, str], int] = {}
+
+
+class StreamStatus:
+    """Outcome of one generate_stream call, so callers never cache a reply that failed part-way"""
+    __slots__ = ("failed",)
+    
+    def __init__(self):
+        self.failed = False  # Set when the stream ends with an error message instead of model output
+
+
+class LLMEngine:
+    """Manages LLM loading and inference via Ollama"""
+    
+    def __init__(self, model_name: str, base_url: str = "http://localhost:11434", prompt_prefix: str = ""):
+        self.model_name = model_name
+        self.base_url = base_url
+        # Text every prompt starts with - primed at load so its KV cache is reused across turns
+        self.prompt_prefix = prompt_prefix
+        # Prefix token count Ollama keeps when it shifts a full context - measured at warm-up
+        self.num_keep = 0
+        self.model = None
+        self.device = "ollama"
+        self._init_session()
+        # Connections pooled before a gunicorn --preload fork must not be shared with workers
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_session)
+        logger.info(f"Initialized LLMEngine (model={model_name}, url={base_url})")
+    
+    def _init_session(self):
+        """Create a keep-alive HTTP session so requests reuse pooled connections to Ollama"""
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def load_model(self) -> bool:
+        """Check if Ollama is running and model is available"""
+        logger.info(f"Checking Ollama connection and model: {self.model_name}")
+        
+        try:
+            # Check if Ollama is running
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code != 200:
+                logger.error(f"Ollama API returned status {response.status_code}")
+                return False
+            
+            # Check if model is available
+            models = orjson.loads(response.content).get("models", [])
+            model_names = [m.get("name", "") for m in models]
+            
+            logger.info(f"Available Ollama models: {model_names}")
+            
+            if self.model_name not in model_names:
+                logger.error(f"Model '{self.model_name}' not found in Ollama")
+                return False
+            
+            self.model = self.model_name
+            self._warm_up()
+            logger.info(f"Ollama model '{self.model_name}' is ready")
+            return True
+        
+        except requests.exceptions.ConnectionError:
+            logger.error("Cannot connect to Ollama. Is Ollama running?")
+            logger.info("Start Ollama with: ollama serve")
+            return False
+        
+        except Exception as e:
+            logger.error(f"Failed to initialize Ollama: {e}")
+            return False
+    
+    def _warm_up(self):
+        """Load the model into memory now so the first query doesn't pay the load time"""
+        # An empty prompt only loads the model; the static prompt prefix also fills its KV cache
+        # so the first real query only processes its variable tail. keep_alive keeps both resident.
+        payload = {"model": self.model_name, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE, "stream": False}
+        if self.prompt_prefix:
+            # Counted before priming, while the KV cache still holds templated text the raw prefix can't reuse
+            self.num_keep = self._count_prefix_tokens()
+            payload["prompt"] = self.prompt_prefix
+            payload["options"] = {"num_predict": 1}
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=OLLAMA_TIMEOUT
+            )
+            if response.status_code == 200:
+                logger.info(f"Ollama model preloaded (keep_alive={OLLAMA_KEEP_ALIVE}, prefix tokens={self.num_keep})")
+            else:
+                logger.warning(f"Ollama model preload returned status {response.status_code}")
+        
+        except Exception as e:
+            logger.warning(f"Ollama model preload failed: {e}")
+    
+    def _count_prefix_tokens(self) -> int:
+        """Token count of the prompt prefix alone, for num_keep
+        
+        Ollama has no tokenize endpoint, so the prefix is evaluated raw (no chat template) and
+        prompt_eval_count read back. Ollama only counts tokens it didn't find in its KV cache -
+        it omits the field or reports ~1 for a cached prompt - so a reading is only ever too low,
+        and the highest one seen is kept. Leading template tokens aren't counted, which errs
+        towards keeping slightly less than the full prefix, never any of the variable tail.
+        """
+        key = (self.base_url, self.model_name, self.prompt_prefix)
+        payload = {
+            "model": self.model_name,
+            "prompt": self.prompt_prefix,
+            "raw": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "stream": False,
+            "options": {"num_predict": 1}
+        }
+        
+        try:
+            response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=OLLAMA_TIMEOUT)
+            if response.status_code == 200:
+                count = orjson.loads(response.content).get("prompt_eval_count") or 0
+                # A single evaluated token means the whole prefix came from the cache
+                if count > max(1, _PREFIX_TOKENS.get(key, 0)):
+                    _PREFIX_TOKENS[key] = count
+        
+        except Exception as e:
+            logger.warning(f"Could not count prompt prefix tokens: {e}")
+        
+        return _PREFIX_TOKENS.get(key, 0)
+    
+    def _build_payload(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        top_k: int,
+        repetition_penalty: float,
+        stream: bool
+    ) -> dict:
+        """Build the /api/generate request payload"""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            # Keep the model loaded so the prompt prefix cache survives between turns
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "top_k": top_k,
+                "repeat_penalty": repetition_penalty,
+                # Stop strings to prevent continuation
+                "stop": STOP_STRINGS,
+            }
+        }
+        if self.num_keep:
+            # Never evict the shared prefix if a long conversation overflows the context window
+            payload["options"]["num_keep"] = self.num_keep
+        return payload
+    
+    @staticmethod
+    def _find_stop(text: str, start: int = 0) -> Optional[int]:
+        """Return the position of the earliest stop string in text[start:], if any"""
+        if AHOCORASICK_AVAILABLE:
+            best = None
+            for end, stop_str in _STOP_AUTOMATON.iter(text, start):
+                # Matches arrive by end position; nothing later can start before best
+                if best is not None and end - _STOP_HOLDBACK > best:
+                    break
+                pos = end - len(stop_str) + 1
+                if best is None or pos < best:
+                    best = pos
+                    found = stop_str
+        else:
+            match = _STOP_RE.search(text, start)
+            best = match.start() if match else None
+            found = match.group() if match else None
+        
+        if best is not None:
+            logger.debug(f"Stopped generation at: {found}")
+        return best
+    
+    def generate(
+        self, 
+        prompt: str, 
+        max_tokens: int = 300,
+        temperature: float = 0.3,
+        top_p: float = 0.85,
+        top_k: int = 50,
+        repetition_penalty: float = 1.1,
+        no_repeat_ngram_size: int = 3
+    ) -> str:
+        """Generate text from prompt using Ollama"""
+        logger.debug(f"Generating response (max_tokens={max_tokens}, temp={temperature})")
+        
+        try:
+            payload = self._build_payload(
+                prompt, max_tokens, temperature, top_p, top_k, repetition_penalty, stream=False
+            )
+            
+            # Make request to Ollama
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=OLLAMA_TIMEOUT
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Ollama API error: {response.status_code}")
+                return f"{LLM_ERROR_PREFIX} I encountered an error generating a response."
+            
+            # Parse response
+            result = orjson.loads(response.content)
+            generated_text = result.get("response", "").strip()
+            
+            logger.debug(f"Generated response length: {len(generated_text)} chars")
+            
+            # Additional cleanup for stop strings (in case Ollama didn't stop)
+            stop_pos = self._find_stop(generated_text)
+            if stop_pos is not None:
+                generated_text = generated_text[:stop_pos].strip()
+            
+            return generated_text
+        
+        except requests.exceptions.Timeout:
+            logger.error("Ollama request timed out")
+            return f"{LLM_ERROR_PREFIX} the request timed out. Please try again."
+        
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return f"{LLM_ERROR_PREFIX} I encountered an error: {str(e)}"
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 300,
+        temperature: float = 0.3,
+        top_p: float = 0.85,
+        top_k: int = 50,
+        repetition_penalty: float = 1.1,
+        status: Optional[StreamStatus] = None
+    ) -> Iterator[str]:
+        """Generate text from prompt using Ollama, yielding text as tokens arrive.
+        
+        On failure an error message is yielded (possibly after partial output)
+        and status.failed is set.
+        """
+        logger.debug(f"Streaming response (max_tokens={max_tokens}, temp={temperature})")
+        
+        try:
+            payload = self._build_payload(
+                prompt, max_tokens, temperature, top_p, top_k, repetition_penalty, stream=True
+            )
+            
+            with self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=OLLAMA_TIMEOUT,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"Ollama API error: {response.status_code}")
+                    if status is not None:
+                        status.failed = True
+                    yield f"{LLM_ERROR_PREFIX} I encountered an error generating a response."
+                    return
+                
+                generated_text = ""
+                emitted = 0
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = orjson.loads(line)
+                    generated_text += result.get("response", "")
+                    if not emitted:
+                        generated_text = generated_text.lstrip()
+                    
+                    # Text already emitted is known to contain no stop string
+                    stop_pos = self._find_stop(generated_text, emitted)
+                    done = result.get("done", False) or stop_pos is not None
+                    if stop_pos is not None:
+                        generated_text = generated_text[:stop_pos].rstrip()
+                    
+                    # Hold back a tail that could be the start of a stop string
+                    safe = len(generated_text) if done else len(generated_text) - _STOP_HOLDBACK
+                    if safe > emitted:
+                        yield generated_text[emitted:safe]
+                        emitted = safe
+                    
+                    if done:
+                        break
+                
+                # Flush whatever was held back if the stream ended without a done marker
+                if emitted < len(generated_text):
+                    yield generated_text[emitted:].rstrip()
+                
+                logger.debug(f"Streamed response length: {len(generated_text)} chars")
+        
+        except requests.exceptions.Timeout:
+            logger.error("Ollama request timed out")
+            if status is not None:
+                status.failed = True
+            yield f"{LLM_ERROR_PREFIX} the request timed out. Please try again."
+        
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            if status is not None:
+                status.failed = True
+            yield f"{LLM_ERROR_PREFIX} I encountered an error: {str(e)}"
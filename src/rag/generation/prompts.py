@@ -9,17 +9,8 @@ def get_general_prompt(user_input: str, recent_context: str = "") -> str:
 Assistant:"""
 
 
-def get_document_aware_prompt(user_input: str, context_docs: list, recent_context: str = "") -> str:
-    """Prompt for answering questions based on documentation"""
-    # Build context with clear separation
-    context = ""
-    for i, doc in enumerate(context_docs, 1):
-        context += f"\n[SOURCE {i}: {doc.source_file}]\n{doc.content}\n"
-    
-    # Add conversation history if available
-    history_section = f"\nCONVERSATION HISTORY:\n{recent_context}\n" if recent_context else ""
-    
-    return f"""You are FlowHCM Assistant, an expert at answering questions about FlowHCM HR management software. Your role is to help users navigate the system and understand processes using the official documentation which contains all the information about the FlowHCM.
+# Static instructions come first so Ollama can reuse the cached KV prefix across queries
+STATIC_SYSTEM_BLOCK = """You are FlowHCM Assistant, an expert at answering questions about FlowHCM HR management software. Your role is to help users navigate the system and understand processes using the official documentation which contains all the information about the FlowHCM.
 
 INSTRUCTIONS:
 
@@ -33,10 +24,25 @@ INSTRUCTIONS:
 
 5. If the documentation does not contain enough information to fully answer the question, use your own knowledge to answer but make it consistent with the document.
 
-6. Keep the answers complete. Do not use the word documentation in the answers.
-
-THIS IS THE INFORMATION YOU HAVE: {context}{history_section}
+6. Keep the answers complete. Do not use the word documentation in the answers."""
 
-ANSWER THIS QUESTION: {user_input}
 
-YOUR ANSWER:"""
\ No newline at end of file
+def get_document_aware_prompt(user_input: str, context_docs: list, recent_context: str = "") -> str:
+    """Prompt for answering questions based on documentation"""
+    # Build context with clear separation
+    context = "".join(
+        f"\n[SOURCE {i}: {doc.source_file}]\n{doc.content}\n"
+        for i, doc in enumerate(context_docs, 1)
+    )
+    
+    # Add conversation history if available
+    history_section = f"\n\nCONVERSATION HISTORY:\n{recent_context}" if recent_context else ""
+    
+    # Order: static instructions -> history -> retrieved context -> question
+    return (
+        STATIC_SYSTEM_BLOCK
+        + history_section
+        + "\n\nTHIS IS THE INFORMATION YOU HAVE: "
+        + context
+        + f"\n\nANSWER THIS QUESTION: {user_input}\n\nYOUR ANSWER:"
+    )
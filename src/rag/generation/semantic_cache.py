@@ -0,0 +1,160 @@
+"""Embedding-similarity cache of generated responses"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+    logger.warning("FAISS not available - semantic response cache limited to exact matches")
+
+CachedResponse = Tuple[str, List]  # (response, sources)
+
+
+class SemanticCache:
+    """Reuses responses for repeated or near-duplicate queries asked in the same context"""
+    
+    def __init__(self, cache_file: str, model_name: str, threshold: float = 0.97,
+                 max_entries: int = 1000, candidates: int = 5):
+        self.cache_file = cache_file
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.candidates = candidates
+        self.index = None
+        self.embeddings = None
+        # (context_key, response, sources), parallel to index rows
+        self.entries: List[Tuple[str, str, List]] = []
+        # Exact tier: (query, context_key) -> (response, sources), in LRU order
+        self.exact: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+    
+    @staticmethod
+    def context_key(recent_context: str, *params) -> str:
+        """Hash of everything besides the query that shapes the response"""
+        hasher = hashlib.sha256()
+        hasher.update(recent_context.encode("utf-8"))
+        hasher.update(repr(params).encode("utf-8"))
+        return hasher.hexdigest()
+    
+    def lookup_exact(self, query: str, context_key: str) -> Optional[CachedResponse]:
+        """Return the cached result for this exact query text, without needing an embedding"""
+        key = (query.strip(), context_key)
+        with self._lock:
+            cached = self.exact.get(key)
+            if cached is not None:
+                self.exact.move_to_end(key)
+                logger.info("Exact cache hit")
+        return cached
+    
+    def lookup(self, query_embedding: np.ndarray, context_key: str) -> Optional[CachedResponse]:
+        """Return a cached result whose query is similar enough and context matches"""
+        if not FAISS_AVAILABLE or query_embedding is None:
+            return None
+        
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return None
+            k = min(self.candidates, self.index.ntotal)
+            scores, indices = self.index.search(query_embedding.reshape(1, -1), k)
+            for score, idx in zip(scores[0], indices[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                cached_key, response, sources = self.entries[idx]
+                if cached_key == context_key:
+                    logger.info(f"Semantic cache hit (similarity: {score:.3f})")
+                    return response, sources
+        return None
+    
+    def insert(self, query: str, query_embedding: Optional[np.ndarray], context_key: str,
+               response: str, sources: List):
+        """Cache a result under both the exact query text and its embedding"""
+        sources = list(sources)
+        key = (query.strip(), context_key)
+        
+        with self._lock:
+            self.exact[key] = (response, sources)
+            self.exact.move_to_end(key)
+            while len(self.exact) > self.max_entries:
+                self.exact.popitem(last=False)
+            self._dirty = True
+            
+            if not FAISS_AVAILABLE or query_embedding is None:
+                return
+            
+            vector = query_embedding.reshape(1, -1).astype('float32')
+            if self.embeddings is None:
+                self.embeddings = vector
+            else:
+                self.embeddings = np.vstack([self.embeddings, vector])
+            self.entries.append((context_key, response, sources))
+            
+            if len(self.entries) > self.max_entries:
+                # Drop the oldest tenth at once so trimming isn't paid on every insert
+                keep = self.max_entries - self.max_entries // 10
+                self.embeddings = self.embeddings[-keep:]
+                self.entries = self.entries[-keep:]
+                self._rebuild_index()
+            else:
+                if self.index is None:
+                    self.index = faiss.IndexFlatIP(vector.shape[1])
+                self.index.add(vector)
+    
+    def _rebuild_index(self):
+        """Rebuild the FAISS index from the stored embeddings"""
+        self.index = faiss.IndexFlatIP(self.embeddings.shape[1])
+        self.index.add(self.embeddings)
+    
+    def save(self):
+        """Persist the cache to disk if it changed"""
+        if not self._dirty:
+            return
+        
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                # Write then rename so concurrent workers never read a partial file
+                tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    pickle.dump({
+                        "model_name": self.model_name,
+                        "embeddings": self.embeddings,
+                        "entries": self.entries,
+                        "exact": self.exact
+                    }, f)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+                logger.info(f"Saved {len(self.exact)} cached responses to {self.cache_file}")
+            except Exception as e:
+                logger.error(f"Failed to save semantic cache: {e}")
+    
+    def _load(self):
+        """Load a previously saved cache for the same model"""
+        if not os.path.exists(self.cache_file):
+            return
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("model_name") != self.model_name or "exact" not in data:
+                logger.info("Ignoring semantic cache saved for a different model or format")
+                return
+            self.exact = data["exact"]
+            if FAISS_AVAILABLE and data.get("embeddings") is not None:
+                self.embeddings = data["embeddings"]
+                self.entries = data["entries"]
+                self._rebuild_index()
+            logger.info(f"Loaded {len(self.exact)} cached responses from {self.cache_file}")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {e}")
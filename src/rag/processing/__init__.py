@@ -1,5 +1,6 @@
 """Document processing components"""
 from .document_processor import DocumentProcessor
 from .chunking import SemanticChunker, DocumentChunk
+from .cache import ChunkCache
 
-__all__ = ["DocumentProcessor", "SemanticChunker", "DocumentChunk"]
+__all__ = ["DocumentProcessor", "SemanticChunker", "DocumentChunk", "ChunkCache"]
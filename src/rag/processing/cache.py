@@ -0,0 +1,61 @@
+"""On-disk cache of loaded documents and their semantic chunks"""
+import os
+import glob
+import pickle
+import hashlib
+import logging
+from typing import List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkCache:
+    """Stores documents and chunks keyed by a manifest of the source files"""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+    
+    def manifest_key(self, file_paths: List[str], settings: str = "") -> str:
+        """Hash of (path, mtime, size) for every file plus the chunking settings"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(settings.encode("utf-8"))
+        for file_path in sorted(file_paths):
+            stat = os.stat(file_path)
+            hasher.update(f"\0{file_path}\0{stat.st_mtime_ns}\0{stat.st_size}".encode("utf-8"))
+        return hasher.hexdigest()
+    
+    def _cache_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"chunk_cache_{key}.pkl")
+    
+    def load(self, key: str) -> Optional[Tuple[List[Dict], List]]:
+        """Return (documents, chunks) cached for a manifest key, if present"""
+        cache_file = self._cache_file(key)
+        if not os.path.exists(cache_file):
+            return None
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                documents, chunks = pickle.load(f)
+            logger.info(f"Loaded {len(documents)} documents and {len(chunks)} chunks from cache")
+            return documents, chunks
+        except Exception as e:
+            logger.warning(f"Failed to load chunk cache: {str(e)}")
+            return None
+    
+    def save(self, key: str, documents: List[Dict], chunks: List):
+        """Cache documents and chunks, removing entries for older manifests"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cache_file = self._cache_file(key)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((documents, chunks), f)
+            os.replace(tmp_file, cache_file)
+            logger.info(f"Saved chunk cache to: {cache_file}")
+            
+            for stale_file in glob.glob(os.path.join(self.cache_dir, "chunk_cache_*.pkl")):
+                if stale_file != cache_file:
+                    os.remove(stale_file)
+        
+        except Exception as e:
+            logger.error(f"Failed to save chunk cache: {str(e)}")
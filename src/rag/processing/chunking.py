@@ -0,0 +1,168 @@
+"""Pure semantic chunking using sentence embeddings and similarity"""
+import importlib.util
+import logging
+import re
+from typing import List, Optional
+from dataclasses import dataclass
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Checked without importing - onnxruntime is heavy and only needed once chunks aren't cached
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("optimum", "onnxruntime"))
+if not ONNX_AVAILABLE:
+    logger.warning("optimum[onnxruntime] not available - chunker uses the PyTorch backend")
+
+# Split on . ! ? followed by space and capital letter
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+@dataclass
+class DocumentChunk:
+    """Document chunk with metadata"""
+    content: str
+    source_file: str
+    chunk_id: int
+    file_type: str
+    relevance_score: float = 0.0
+
+
+class SemanticChunker:
+    """Creates semantic chunks by analyzing sentence similarity"""
+    
+    def __init__(self, chunk_size: int = None, overlap: int = None, similarity_threshold: float = 0.7,
+                 onnx_file: Optional[str] = None, window: int = 1):
+        self.similarity_threshold = similarity_threshold
+        self.window = max(1, window)  # Sentences compared on each side of a candidate boundary
+        self.model_name = 'all-MiniLM-L6-v2'  # Fast, lightweight model
+        self.onnx_file = onnx_file
+        self.backend = "onnx" if onnx_file and ONNX_AVAILABLE else "torch"
+        self._encoder = None
+        logger.info(f"Initialized SemanticChunker (pure semantic mode, threshold={similarity_threshold}, window={self.window})")
+    
+    @property
+    def encoder(self) -> SentenceTransformer:
+        """Sentence model, loaded on first use so cached chunks never pay for it"""
+        if self._encoder is None:
+            logger.info("Loading sentence embedding model for semantic analysis...")
+            if self.backend == "onnx":
+                self._encoder = self._load_onnx_encoder()
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(self.model_name)
+            logger.info(f"Sentence embedding model loaded (backend={self.backend})")
+        return self._encoder
+    
+    def _load_onnx_encoder(self) -> Optional[SentenceTransformer]:
+        """Load the int8-quantized ONNX export of the model, or None to fall back to PyTorch"""
+        try:
+            # Needs sentence-transformers>=3.2 with optimum[onnxruntime] installed
+            return SentenceTransformer(
+                self.model_name,
+                backend="onnx",
+                model_kwargs={"file_name": self.onnx_file}
+            )
+        except Exception as e:
+            logger.warning(f"ONNX int8 encoder unavailable ({e}) - using default backend")
+            self.backend = "torch"
+            return None
+    
+    @property
+    def settings_signature(self) -> str:
+        """Settings that change chunk output, for cache keys (backend drops to torch if the ONNX load fails)"""
+        backend = f"onnx:{self.onnx_file}" if self.backend == "onnx" else "torch"
+        return f"{self.model_name}|{backend}|{self.similarity_threshold}|{self.window}"
+    
+    def create_chunks(self, documents: List[dict]) -> List[DocumentChunk]:
+        """Create semantic chunks from documents"""
+        logger.info(f"Creating semantic chunks from {len(documents)} documents")
+        chunks = []
+        
+        # Split every document first so all sentences can be encoded in one batched call
+        doc_sentences = [self._split_into_sentences(doc['content']) for doc in documents]
+        all_sentences = []
+        offsets = [0]
+        for sentences in doc_sentences:
+            # Single-sentence docs need no boundary detection, so skip encoding them
+            if len(sentences) > 1:
+                all_sentences.extend(sentences)
+            offsets.append(len(all_sentences))
+        
+        if all_sentences:
+            logger.info(f"Encoding {len(all_sentences)} sentences for semantic analysis...")
+            all_embeddings = self.encoder.encode(
+                all_sentences,
+                batch_size=256,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        
+        for i, doc in enumerate(documents):
+            sentences = doc_sentences[i]
+            if len(sentences) > 1:
+                embeddings = all_embeddings[offsets[i]:offsets[i + 1]]
+            else:
+                embeddings = None
+            doc_chunks = self._chunk_document_from_embeddings(doc, sentences, embeddings)
+            chunks.extend(doc_chunks)
+            logger.debug(f"Created {len(doc_chunks)} chunks from {doc['name']}")
+        
+        logger.info(f"Total chunks created: {len(chunks)}")
+        return chunks
+    
+    def _chunk_document_from_embeddings(self, doc: dict, sentences: List[str],
+                                        embeddings: np.ndarray) -> List[DocumentChunk]:
+        """Chunk document using semantic similarity between pre-encoded sentences"""
+        if len(sentences) <= 1:
+            # Single sentence or empty - return as one chunk
+            return [DocumentChunk(
+                content=doc['content'].strip(),
+                source_file=doc['name'],
+                chunk_id=0,
+                file_type=doc['type']
+            )]
+        
+        logger.debug(f"Analyzing {len(sentences)} sentences for semantic boundaries...")
+        
+        similarities = self._window_similarities(embeddings)
+        
+        # Low similarity across a gap = semantic boundary
+        boundaries = np.flatnonzero(similarities < self.similarity_threshold) + 1
+        if logger.isEnabledFor(logging.DEBUG):
+            for i in boundaries:
+                logger.debug(f"Semantic boundary detected at sentence {i} (similarity: {similarities[i - 1]:.3f})")
+        
+        chunks = []
+        for chunk_id, indices in enumerate(np.split(np.arange(len(sentences)), boundaries)):
+            chunks.append(DocumentChunk(
+                content=' '.join(sentences[indices[0]:indices[-1] + 1]),
+                source_file=doc['name'],
+                chunk_id=chunk_id,
+                file_type=doc['type']
+            ))
+        
+        logger.debug(f"Document '{doc['name']}' split into {len(chunks)} semantic chunks")
+        return chunks
+    
+    def _window_similarities(self, embeddings: np.ndarray) -> np.ndarray:
+        """Similarity across each gap between the `window` sentences before and after it"""
+        n = len(embeddings)
+        gaps = np.arange(1, n)
+        
+        # Prefix sums give every window sum with one subtraction
+        prefix = np.zeros((n + 1, embeddings.shape[1]), dtype=embeddings.dtype)
+        np.cumsum(embeddings, axis=0, out=prefix[1:])
+        left = prefix[gaps] - prefix[np.maximum(gaps - self.window, 0)]
+        right = prefix[np.minimum(gaps + self.window, n)] - prefix[gaps]
+        
+        # Cosine of window means == cosine of window sums
+        left /= np.maximum(np.linalg.norm(left, axis=1, keepdims=True), 1e-12)
+        right /= np.maximum(np.linalg.norm(right, axis=1, keepdims=True), 1e-12)
+        return np.einsum('ij,ij->i', left, right)
+    
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """Split text into sentences"""
+        # Simple sentence splitting (can be improved with spaCy/NLTK)
+        parts = _SENT_SPLIT_RE.split(text)
+        return [s for s in (p.strip() for p in parts) if s]
@@ -2,7 +2,8 @@
 import os
 import glob
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -22,32 +23,38 @@ class DocumentProcessor:
         self.docs_folder = docs_folder
         logger.info(f"Initialized DocumentProcessor with folder: {docs_folder}")
     
-    def load_documents(self) -> List[Dict]:
-        """Load all documents from the docs folder"""
+    def list_files(self) -> List[str]:
+        """List every file under the docs folder, sorted for a stable order"""
+        file_pattern = os.path.join(self.docs_folder, "**/*")
+        return sorted(p for p in glob.glob(file_pattern, recursive=True) if os.path.isfile(p))
+    
+    def load_documents(self, file_paths: Optional[List[str]] = None) -> List[Dict]:
+        """Load all documents from the docs folder (or the given files)"""
         logger.info(f"Starting document loading from: {self.docs_folder}")
         
         if not os.path.exists(self.docs_folder):
             logger.error(f"Docs folder not found: {self.docs_folder}")
             return []
         
-        documents = []
-        file_pattern = os.path.join(self.docs_folder, "**/*")
+        if file_paths is None:
+            file_paths = self.list_files()
         
-        for file_path in glob.glob(file_pattern, recursive=True):
-            if os.path.isfile(file_path):
-                logger.debug(f"Processing file: {file_path}")
-                content = self._extract_content(file_path)
-                
-                if content and content.strip():
-                    documents.append({
-                        'path': file_path,
-                        'name': os.path.basename(file_path),
-                        'content': content,
-                        'type': os.path.splitext(file_path)[1][1:] or 'unknown'
-                    })
-                    logger.info(f"Loaded: {os.path.basename(file_path)} ({len(content)} chars)")
-                else:
-                    logger.warning(f"Skipped empty/unreadable: {file_path}")
+        # DOCX parsing is zip/XML work that parallelizes well across threads
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            contents = list(executor.map(self._extract_content, file_paths))
+        
+        documents = []
+        for file_path, content in zip(file_paths, contents):
+            if content and content.strip():
+                documents.append({
+                    'path': file_path,
+                    'name': os.path.basename(file_path),
+                    'content': content,
+                    'type': os.path.splitext(file_path)[1][1:] or 'unknown'
+                })
+                logger.info(f"Loaded: {os.path.basename(file_path)} ({len(content)} chars)")
+            else:
+                logger.warning(f"Skipped empty/unreadable: {file_path}")
         
         logger.info(f"Total documents loaded: {len(documents)}")
         return documents
@@ -56,12 +63,14 @@ class DocumentProcessor:
         """Extract text content from DOCX files only"""
         file_ext = os.path.splitext(file_path)[1].lower()
         
+        logger.debug(f"Processing file: {file_path}")
+        
         try:
             # Word documents only
             if file_ext == '.docx' and DOCX_AVAILABLE:
                 logger.debug(f"Extracting DOCX: {file_path}")
                 doc = Document(file_path)
-                return '\n\n'.join([p.text.strip() for p in doc.paragraphs if p.text.strip()])
+                return '\n\n'.join(t for p in doc.paragraphs if (t := p.text.strip()))
             else:
                 logger.warning(f"Unsupported file type: {file_path} (only .docx supported)")
                 return ""
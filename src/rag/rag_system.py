@@ -0,0 +1,517 @@
+"""Main RAG system orchestrating all components"""
+import hashlib
+import logging
+import math
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+
+from .config import *
+from .processing.document_processor import DocumentProcessor
+from .processing.chunking import SemanticChunker, DocumentChunk
+from .processing.cache import ChunkCache
+from .retrieval.vector_store import VectorStore
+from .retrieval.retriever import SemanticRetriever
+from .generation.llm_engine import LLMEngine, StreamStatus
+from .generation.semantic_cache import SemanticCache
+from .generation.prompts import (
+    get_general_prompt, 
+    get_document_aware_prompt,
+    STATIC_SYSTEM_BLOCK
+)
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """Documents, chunks and the retriever built over them, swapped in as one object on reload"""
+    documents: List[Dict] = field(default_factory=list)
+    chunks: List[DocumentChunk] = field(default_factory=list)
+    version: Optional[str] = None  # Hash of the chunk set, part of response cache keys
+    retriever: Optional[SemanticRetriever] = None
+
+
+class RAGSystem:
+    """Complete RAG system"""
+    
+    def __init__(self):
+        logger.info("="*60)
+        logger.info("Initializing RAG System")
+        logger.info("="*60)
+        
+        # Components
+        self.doc_processor = DocumentProcessor(DOCS_FOLDER)
+        self.chunker = SemanticChunker(
+            similarity_threshold=SEMANTIC_SIMILARITY_THRESHOLD,
+            onnx_file=CHUNKER_ONNX_FILE,
+            window=CHUNK_SIMILARITY_WINDOW
+        )
+        self.chunk_cache = ChunkCache(CHUNK_CACHE_DIR)
+        self.vector_store = VectorStore(
+            EMBEDDING_MODEL,
+            FAISS_INDEX_FILE,
+            CHUNKS_FILE,
+            index_type=FAISS_INDEX_TYPE,
+            nprobe=FAISS_NLIST_SEARCH,
+            min_vectors_for_index=FAISS_MIN_VECTORS_FOR_INDEX,
+            hnsw_ef_construction=FAISS_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=FAISS_HNSW_EF_SEARCH,
+            refine_k_factor=FAISS_REFINE_K_FACTOR,
+            query_batch_size=QUERY_BATCH_SIZE,
+            query_batch_wait=QUERY_BATCH_WAIT,
+            embedding_cache_file=EMBEDDING_CACHE_FILE,
+            embedding_cache_max_queries=EMBEDDING_CACHE_MAX_QUERIES,
+            use_gpu=USE_GPU_FAISS
+        )
+        self.llm_engine = LLMEngine(MODEL_NAME, OLLAMA_BASE_URL, prompt_prefix=STATIC_SYSTEM_BLOCK)
+        self.response_cache = None
+        if RESPONSE_CACHE_ENABLED:
+            self.response_cache = SemanticCache(
+                RESPONSE_CACHE_FILE,
+                MODEL_NAME,
+                threshold=RESPONSE_CACHE_THRESHOLD,
+                max_entries=RESPONSE_CACHE_MAX_ENTRIES
+            )
+        
+        # Data
+        self.corpus = Corpus()
+        self.messages = []
+        self.corpus_manifest = None  # Snapshot of the docs folder the corpus was loaded from
+        
+        logger.info("RAG System initialized")
+    
+    @property
+    def documents(self) -> List[Dict]:
+        """Loaded documents, with display summaries"""
+        return self.corpus.documents
+    
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        """Chunks of the loaded documents"""
+        return self.corpus.chunks
+    
+    @property
+    def corpus_version(self) -> Optional[str]:
+        """Hash of the current chunk set"""
+        return self.corpus.version
+    
+    @property
+    def retriever(self) -> Optional[SemanticRetriever]:
+        """Retriever over the current corpus (None until a corpus is set)"""
+        return self.corpus.retriever
+    
+    def initialize(self, corpus: Optional[Tuple[List[Dict], List[DocumentChunk]]] = None) -> bool:
+        """Initialize all components (corpus: preloaded (documents, chunks) from read_corpus)"""
+        logger.info("Starting system initialization")
+        
+        # Load LLM
+        logger.info("Loading LLM model")
+        if not self.llm_engine.load_model():
+            logger.error("Failed to load LLM model")
+            return False
+        logger.info("LLM model loaded successfully")
+        
+        # Load documents and chunks (reused from disk when the docs are unchanged)
+        documents, chunks = corpus if corpus is not None else self.read_corpus()
+        if not self.set_corpus(documents, chunks):
+            return False
+        
+        logger.info("="*60)
+        logger.info("RAG System initialization complete")
+        logger.info(f"Documents: {len(self.documents)}")
+        logger.info(f"Chunks: {len(self.chunks)}")
+        logger.info("="*60)
+        return True
+    
+    def set_corpus(self, documents: List[Dict], chunks: List[DocumentChunk]) -> bool:
+        """Build the vector index and retriever for documents and chunks, then switch queries to them.
+        
+        The current corpus keeps serving queries until the new one is complete;
+        queries already running finish against the corpus they started with.
+        """
+        if not documents or not chunks:
+            return False
+        
+        self._add_document_summaries(documents)
+        
+        # Cached responses are only valid for the corpus they were generated from
+        corpus_hasher = hashlib.blake2b(digest_size=16)
+        for chunk in chunks:
+            corpus_hasher.update(f"{chunk.source_file}\0{chunk.chunk_id}\0{chunk.content}\0".encode("utf-8"))
+        
+        # Build vector index
+        logger.info("Building vector index")
+        search_index = self.vector_store.build_index(chunks)
+        if search_index is None:
+            logger.error("Failed to build vector index")
+            return False
+        
+        # Initialize retriever
+        retriever = SemanticRetriever(self.vector_store, search_index)
+        logger.info("Retriever initialized")
+        
+        self.corpus = Corpus(documents, chunks, corpus_hasher.hexdigest(), retriever)
+        return True
+    
+    def query(
+        self, 
+        user_input: str,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        top_p: float = DEFAULT_TOP_P
+    ) -> Tuple[str, List[DocumentChunk]]:
+        """Process a user query and generate response (with internal history)"""
+        recent_context = self.get_recent_context(RECENT_CONTEXT_EXCHANGES)
+        response, sources, _ = self.query_with_context(
+            user_input,
+            recent_context,
+            max_tokens,
+            temperature,
+            top_p
+        )
+        
+        # Save to internal history
+        self.add_message("user", user_input, sources)
+        self.add_message("assistant", response)
+        
+        return response, sources
+    
+    def read_corpus(self) -> Tuple[List[Dict], List[DocumentChunk]]:
+        """Load documents and chunk them, skipping both when the chunk cache matches"""
+        logger.info("Loading documents")
+        file_paths = self.doc_processor.list_files()
+        signature = self.chunker.settings_signature
+        cache_key = self.chunk_cache.manifest_key(file_paths, signature)
+        
+        cached = self.chunk_cache.load(cache_key)
+        if cached is not None:
+            return cached
+        
+        documents = self.doc_processor.load_documents(file_paths)
+        if not documents:
+            logger.warning("No documents loaded")
+            return [], []
+        
+        # Create chunks
+        logger.info("Creating document chunks")
+        chunks = self.chunker.create_chunks(documents)
+        if not chunks:
+            logger.error("Failed to create chunks")
+            return documents, []
+        
+        # Chunking resolved the encoder - key the cache by the backend that actually produced the chunks
+        if self.chunker.settings_signature != signature:
+            cache_key = self.chunk_cache.manifest_key(file_paths, self.chunker.settings_signature)
+        self.chunk_cache.save(cache_key, documents, chunks)
+        return documents, chunks
+    
+    @staticmethod
+    def _add_document_summaries(documents: List[Dict]):
+        """Precompute display fields so UIs don't re-slice content on every render"""
+        for doc in documents:
+            content = doc["content"]
+            doc["size"] = len(content)
+            doc["preview"] = content[:DOC_PREVIEW_CHARS] + ("..." if len(content) > DOC_PREVIEW_CHARS else "")
+    
+    def embed_query(self, user_input: str) -> Optional[np.ndarray]:
+        """Embed a query ahead of retrieval (lets callers overlap it with other I/O)"""
+        return self.vector_store.encode_query(user_input)
+    
+    def query_with_context(
+        self, 
+        user_input: str,
+        recent_context: str = "",
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        top_p: float = DEFAULT_TOP_P,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Tuple[str, List[DocumentChunk], bool]:
+        """Process a user query with external context (for session management).
+        
+        Returns (response, sources, failed); failed marks error replies, which
+        callers must not cache.
+        """
+        status = StreamStatus()
+        try:
+            # Joining the stream gives the cleaned response (and caches it)
+            stream, relevant_docs = self.query_stream_with_context(
+                user_input, recent_context, max_tokens, temperature, top_p, query_embedding, status
+            )
+            response = "".join(stream)
+            
+            logger.info(f"Response generated: {len(response)} chars")
+            logger.info("="*60)
+            return response, relevant_docs, status.failed
+        
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}", exc_info=True)
+            return f"I apologize, but I encountered an issue: {str(e)}", [], True
+    
+    def query_stream_with_context(
+        self,
+        user_input: str,
+        recent_context: str = "",
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        top_p: float = DEFAULT_TOP_P,
+        query_embedding: Optional[np.ndarray] = None,
+        status: Optional[StreamStatus] = None
+    ) -> Tuple[Iterator[str], List[DocumentChunk]]:
+        """Streaming variant of query_with_context: returns a text stream and the sources used.
+        
+        The stream yields cleaned text as whole sentences are generated; joined,
+        it equals utils.clean_response of the full model output. status.failed
+        is set once the stream has produced an error reply.
+        """
+        if status is None:
+            status = StreamStatus()
+        try:
+            # One corpus for the whole query, even if the documents are reloaded meanwhile
+            corpus = self.corpus
+            
+            # Repeated or near-duplicate queries skip retrieval and generation
+            cached, cache_key, query_embedding = self._lookup_cached_response(
+                corpus, user_input, recent_context, max_tokens, temperature, top_p, query_embedding
+            )
+            if cached is not None:
+                response, sources = cached
+                return iter([response]), sources
+            
+            prompt, relevant_docs = self._prepare_prompt(
+                corpus, user_input, recent_context, max_tokens, temperature, top_p, query_embedding
+            )
+            
+            stream = utils.clean_response_stream(self.llm_engine.generate_stream(
+                prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                status=status
+            ))
+            
+            if cache_key is None:
+                return stream, relevant_docs
+            
+            def cache_on_completion():
+                parts = []
+                for piece in stream:
+                    parts.append(piece)
+                    yield piece
+                # A reply that failed part-way ends in an error message and must not be replayed
+                if not status.failed:
+                    self._cache_response(user_input, query_embedding, cache_key, "".join(parts), relevant_docs)
+            
+            return cache_on_completion(), relevant_docs
+        
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}", exc_info=True)
+            status.failed = True
+            return iter([f"I apologize, but I encountered an issue: {str(e)}"]), []
+    
+    def query_stream(
+        self,
+        user_input: str,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        top_p: float = DEFAULT_TOP_P
+    ) -> Tuple[Iterator[str], List[DocumentChunk]]:
+        """Streaming variant of query: history is saved once the stream is exhausted"""
+        recent_context = self.get_recent_context(RECENT_CONTEXT_EXCHANGES)
+        stream, sources = self.query_stream_with_context(
+            user_input,
+            recent_context,
+            max_tokens,
+            temperature,
+            top_p
+        )
+        
+        def record_history():
+            parts = []
+            for piece in stream:
+                parts.append(piece)
+                yield piece
+            
+            # Save to internal history
+            self.add_message("user", user_input, sources)
+            self.add_message("assistant", "".join(parts))
+        
+        return record_history(), sources
+    
+    def _lookup_cached_response(
+        self,
+        corpus: Corpus,
+        user_input: str,
+        recent_context: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        query_embedding: Optional[np.ndarray]
+    ) -> Tuple[Optional[Tuple[str, List[DocumentChunk]]], Optional[str], Optional[np.ndarray]]:
+        """Check the response cache ahead of retrieval: returns (hit, cache_key, query_embedding)"""
+        if self.response_cache is None:
+            return None, None, query_embedding
+        
+        cache_key = SemanticCache.context_key(
+            recent_context, corpus.version, max_tokens, temperature, top_p
+        )
+        cached = self.response_cache.lookup_exact(user_input, cache_key)
+        if cached is None:
+            if query_embedding is None:
+                # Embed once so the cache and retrieval share it
+                query_embedding = self.embed_query(user_input)
+            cached = self.response_cache.lookup(query_embedding, cache_key)
+        return cached, cache_key, query_embedding
+    
+    def _cache_response(
+        self,
+        user_input: str,
+        query_embedding: Optional[np.ndarray],
+        cache_key: Optional[str],
+        response: str,
+        sources: List[DocumentChunk]
+    ):
+        """Remember a successfully generated response"""
+        if cache_key is None:
+            return
+        self.response_cache.insert(user_input, query_embedding, cache_key, response, sources)
+    
+    def save_caches(self):
+        """Persist in-process caches to disk (call on shutdown)"""
+        self.vector_store.save_caches()
+        if self.response_cache is not None:
+            self.response_cache.save()
+    
+    def _prepare_prompt(
+        self,
+        corpus: Corpus,
+        user_input: str,
+        recent_context: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Tuple[str, List[DocumentChunk]]:
+        """Retrieve context for a query and build the prompt to send to the LLM"""
+        logger.info("="*60)
+        logger.info(f"Processing query: '{user_input}'")
+        logger.info(f"Params: max_tokens={max_tokens}, temp={temperature}, top_p={top_p}")
+        
+        # Retrieve relevant documents
+        logger.info("Retrieving relevant documents")
+        context_docs = corpus.retriever.retrieve(user_input, TOP_K_RETRIEVAL, query_embedding)
+        
+        if not context_docs:
+            logger.warning("No context documents found")
+            logger.info(">>> DECISION: Using GENERAL RESPONSE (no context docs)")
+            return self._build_general_prompt(user_input, recent_context), []
+        
+        # Dynamic threshold filtering
+        # A dozen floats - one plain-Python pass beats NumPy's array conversion and dispatch here
+        score_sum = 0.0
+        score_sq_sum = 0.0
+        for doc in context_docs:
+            score_sum += doc.relevance_score
+            score_sq_sum += doc.relevance_score * doc.relevance_score
+        mean_score = score_sum / len(context_docs)
+        std_score = math.sqrt(max(0.0, score_sq_sum / len(context_docs) - mean_score * mean_score))
+        logger.info(f"Score stats: mean={mean_score:.3f}, std={std_score:.3f}")
+        
+        dynamic_threshold = max(MIN_RELEVANCE_THRESHOLD, mean_score - 0.5 * std_score)
+        logger.info(f"Dynamic threshold: {dynamic_threshold:.3f}")
+        
+        # Search returns hits best-first, so filtering, top-k and collecting sources
+        # is one scan up to the first miss
+        relevant_docs = []
+        unique_sources = set()
+        for doc in context_docs:
+            if doc.relevance_score < dynamic_threshold or len(relevant_docs) == TOP_K_CONTEXT:
+                break
+            relevant_docs.append(doc)
+            unique_sources.add(doc.source_file)
+        logger.info(f"Using top {len(relevant_docs)} documents above threshold")
+        
+        if not relevant_docs:
+            logger.warning("No documents passed threshold")
+            logger.info(">>> DECISION: Using GENERAL RESPONSE (no relevant docs)")
+            return self._build_general_prompt(user_input, recent_context), []
+        
+        # Log unique sources
+        logger.info(f"Unique source documents: {len(unique_sources)}")
+        for source in unique_sources:
+            logger.info(f"  - {source}")
+        
+        logger.info(">>> DECISION: Using DOCUMENT-AWARE RESPONSE")
+        return self._build_document_prompt(user_input, relevant_docs, recent_context), relevant_docs
+    
+    def _build_general_prompt(self, user_input: str, recent_context: str) -> str:
+        """Build prompt without document context"""
+        logger.info("Generating general response (no relevant documents found)")
+        prompt = get_general_prompt(user_input, recent_context)
+        
+        # Log the prompt (debug only - lazy formatting keeps it free otherwise)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("="*60)
+            logger.debug("GENERAL PROMPT SENT TO LLM:\n%s", prompt)
+            logger.debug("="*60)
+        return prompt
+    
+    def _build_document_prompt(
+        self,
+        user_input: str,
+        context_docs: List[DocumentChunk],
+        recent_context: str
+    ) -> str:
+        """Build prompt with document context"""
+        logger.info("Generating document-aware response")
+        
+        # Log the chunks being used (debug only - chunks can be several KB each)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("="*60)
+            logger.debug("CONTEXT CHUNKS USED FOR GENERATION:")
+            for i, doc in enumerate(context_docs, 1):
+                logger.debug("\n--- Chunk %d ---", i)
+                logger.debug("Source: %s", doc.source_file)
+                logger.debug("Chunk ID: %s", doc.chunk_id)
+                logger.debug("Relevance Score: %.3f", doc.relevance_score)
+                logger.debug("Content Length: %d chars", len(doc.content))
+                logger.debug("Content:\n%s", doc.content)
+            logger.debug("="*60)
+        
+        prompt = get_document_aware_prompt(user_input, context_docs, recent_context)
+        
+        # Log the full prompt
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("="*60)
+            logger.debug("FULL PROMPT SENT TO LLM:\n%s", prompt)
+            logger.debug("="*60)
+        return prompt
+    
+    def add_message(self, role: str, content: str, context_docs: List[DocumentChunk] = None):
+        """Add message to conversation history"""
+        self.messages.append({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now(),
+            "context_docs": context_docs or []
+        })
+        
+        # Maintain history limit
+        if len(self.messages) > MAX_HISTORY * 2:
+            self.messages = self.messages[-MAX_HISTORY * 2:]
+    
+    def get_recent_context(self, num_exchanges: int = 2) -> str:
+        """Get recent conversation context"""
+        recent_messages = self.messages[-(num_exchanges * 2):]
+        context = ""
+        for msg in recent_messages:
+            role = "Human" if msg["role"] == "user" else "Assistant"
+            context += f"{role}: {msg['content']}\n"
+        return context
+    
+    def clear_conversation(self):
+        """Clear conversation history"""
+        logger.info("Clearing conversation history")
+        self.messages.clear()
@@ -0,0 +1,7 @@
+"""Retrieval components"""
+from .vector_store import VectorStore, SearchIndex
+from .retriever import SemanticRetriever
+from .query_batcher import QueryBatcher
+from .embedding_cache import EmbeddingCache
+
+__all__ = ["VectorStore", "SearchIndex", "SemanticRetriever", "QueryBatcher", "EmbeddingCache"]
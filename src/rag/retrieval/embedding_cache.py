@@ -0,0 +1,114 @@
+"""Content-hash cache of query and chunk embeddings"""
+import os
+import pickle
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Keeps embeddings keyed by SHA-256 of their text so repeated texts skip the encoder"""
+    
+    def __init__(self, cache_file: str, model_name: str, max_queries: int = 10000):
+        self.cache_file = cache_file
+        self.model_name = model_name
+        self.max_queries = max_queries
+        # query hash -> (1, dim) embedding, in LRU order
+        self.queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # chunk content hash -> (dim,) embedding, for the current corpus only
+        self.chunks: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+    
+    @staticmethod
+    def query_key(query: str) -> str:
+        """Hash of the normalized query text"""
+        return hashlib.sha256(query.strip().lower().encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def content_key(content: str) -> str:
+        """Hash of a chunk's exact content"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def get_query(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a query, if any"""
+        key = self.query_key(query)
+        with self._lock:
+            embedding = self.queries.get(key)
+            if embedding is not None:
+                self.queries.move_to_end(key)
+        return embedding
+    
+    def put_query(self, query: str, embedding: np.ndarray):
+        """Cache a query embedding, evicting the least recently used beyond max_queries"""
+        key = self.query_key(query)
+        with self._lock:
+            # Batched encodes hand back views into the whole batch - keep just this row
+            self.queries[key] = np.array(embedding, dtype='float32', copy=True)
+            self.queries.move_to_end(key)
+            while len(self.queries) > self.max_queries:
+                self.queries.popitem(last=False)
+            self._dirty = True
+    
+    def missing_chunks(self, keys: List[str]) -> List[int]:
+        """Positions of chunk content hashes that have no cached embedding"""
+        with self._lock:
+            return [i for i, key in enumerate(keys) if key not in self.chunks]
+    
+    def set_chunks(self, keys: List[str], embeddings: Dict[str, np.ndarray]) -> np.ndarray:
+        """Replace the chunk cache with the current corpus and return its embedding matrix"""
+        with self._lock:
+            # Only the current corpus is kept so removed documents don't accumulate
+            self.chunks = {key: embeddings.get(key, self.chunks.get(key)) for key in keys}
+            self._dirty = True
+            # Rows are float32 already, so vstack's result can go straight to FAISS
+            return np.vstack([self.chunks[key] for key in keys])
+    
+    def save(self):
+        """Persist the cache to disk if it changed"""
+        if not self._dirty:
+            return
+        
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                # Write then rename so concurrent workers never read a partial file
+                tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    pickle.dump({
+                        "model_name": self.model_name,
+                        "queries": self.queries,
+                        "chunks": self.chunks
+                    }, f)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+                logger.info(
+                    f"Saved {len(self.queries)} query and {len(self.chunks)} chunk embeddings to {self.cache_file}"
+                )
+            except Exception as e:
+                logger.error(f"Failed to save embedding cache: {e}")
+    
+    def _load(self):
+        """Load a previously saved cache for the same embedding model"""
+        if not os.path.exists(self.cache_file):
+            return
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("model_name") != self.model_name:
+                logger.info("Ignoring embedding cache saved for a different model")
+                return
+            self.queries = data["queries"]
+            self.chunks = data["chunks"]
+            logger.info(
+                f"Loaded {len(self.queries)} query and {len(self.chunks)} chunk embeddings from {self.cache_file}"
+            )
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache: {e}")
@@ -0,0 +1,87 @@
+"""Micro-batching of concurrent query encodes"""
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBatcher:
+    """Coalesces queries encoded concurrently from worker threads into one batched encode call"""
+    
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch: int = 32,
+        max_wait: float = 0.005
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+    
+    def encode(self, query: str) -> np.ndarray:
+        """Encode one query, blocking until its batch has been processed"""
+        future = Future()
+        self._ensure_worker().put((query, future))
+        return future.result()
+    
+    def _ensure_worker(self) -> "queue.Queue":
+        """Start the worker on first use (and again in each forked worker process)"""
+        if self._worker_pid != os.getpid():
+            with self._start_lock:
+                if self._worker_pid != os.getpid():
+                    self._queue = queue.Queue()
+                    threading.Thread(
+                        target=self._run, args=(self._queue,), name="query-batcher", daemon=True
+                    ).start()
+                    self._worker_pid = os.getpid()
+        return self._queue
+    
+    def _run(self, requests: "queue.Queue"):
+        """Encode queued queries together, lingering up to max_wait only under concurrent load"""
+        while True:
+            batch = [requests.get()]
+            self._drain(requests, batch)
+            
+            # A lone query is encoded right away; others already waiting mean more are likely on the way
+            if len(batch) > 1:
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(requests.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                    self._drain(requests, batch)
+            
+            try:
+                embeddings = self.encode_fn([query for query, _ in batch])
+            except Exception as e:
+                logger.error(f"Batched query encode failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            if len(batch) > 1:
+                logger.debug(f"Encoded {len(batch)} queries in one batch")
+            for i, (_, future) in enumerate(batch):
+                future.set_result(embeddings[i:i + 1])
+    
+    def _drain(self, requests: "queue.Queue", batch: list):
+        """Move already-queued requests into the batch without waiting"""
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(requests.get_nowait())
+            except queue.Empty:
+                return
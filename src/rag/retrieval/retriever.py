@@ -1,4 +1,5 @@
 """Semantic retrieval using vector search"""
+import dataclasses
 import logging
 from typing import List
 
@@ -8,17 +9,19 @@ logger = logging.getLogger(__name__)
 class SemanticRetriever:
     """Semantic search using vector similarity"""
     
-    def __init__(self, vector_store, chunks: List):
+    def __init__(self, vector_store, search_index):
         self.vector_store = vector_store
-        self.chunks = chunks
+        # Index and chunks come from one build, so results always index the right chunk list
+        self.search_index = search_index
+        self.chunks = search_index.chunks
         logger.info("Initialized SemanticRetriever")
     
-    def retrieve(self, query: str, top_k: int = 12) -> List:
+    def retrieve(self, query: str, top_k: int = 12, query_embedding=None) -> List:
         """Semantic search using vector similarity"""
         logger.info(f"Semantic search for: '{query}' (top_k={top_k})")
         
         # Get semantic scores from vector store
-        semantic_results = self.vector_store.search(query, top_k)
+        semantic_results = self.vector_store.search(self.search_index, query, top_k, query_embedding)
         
         if not semantic_results:
             logger.warning("No semantic results found")
@@ -30,8 +33,8 @@ class SemanticRetriever:
         results = []
         for idx, score in semantic_results:
             if idx < len(self.chunks):
-                chunk = self.chunks[idx]
-                chunk.relevance_score = score
+                # Per-request copy - corpus chunks are shared by concurrent queries and never mutated
+                chunk = dataclasses.replace(self.chunks[idx], relevance_score=score)
                 results.append(chunk)
                 logger.debug(f"Result {len(results)}: score={score:.3f}, source={chunk.source_file}")
         
@@ -0,0 +1,358 @@
+"""FAISS vector store for semantic search"""
+import os
+import math
+import pickle
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from .query_batcher import QueryBatcher
+from .embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    VECTOR_SEARCH_AVAILABLE = True
+except ImportError:
+    VECTOR_SEARCH_AVAILABLE = False
+    logger.warning("FAISS or sentence-transformers not available")
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """A FAISS index and the chunks its vectors were built from, replaced together on rebuild"""
+    index: Any
+    chunks: List
+    index_type: str
+    on_gpu: bool = False
+
+
+class VectorStore:
+    """Manages FAISS index for semantic search"""
+    
+    def __init__(
+        self,
+        embedding_model: str,
+        index_file: str,
+        chunks_file: str,
+        index_type: str = "Flat",
+        nprobe: int = 16,
+        min_vectors_for_index: int = 0,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+        refine_k_factor: int = 4,
+        query_batch_size: int = 32,
+        query_batch_wait: float = 0.005,
+        embedding_cache_file: Optional[str] = None,
+        embedding_cache_max_queries: int = 10000,
+        use_gpu: bool = False
+    ):
+        self.embedding_model_name = embedding_model
+        self.index_file = index_file
+        self.chunks_file = chunks_file
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.min_vectors_for_index = min_vectors_for_index
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.refine_k_factor = refine_k_factor
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+        self.use_gpu = use_gpu
+        self.gpu_resources = None
+        self.query_batcher = None
+        if query_batch_size > 1:
+            self.query_batcher = QueryBatcher(self.encode_queries, query_batch_size, query_batch_wait)
+        self.embedding_cache = None
+        if embedding_cache_file:
+            self.embedding_cache = EmbeddingCache(
+                embedding_cache_file, embedding_model, embedding_cache_max_queries
+            )
+        
+        if not VECTOR_SEARCH_AVAILABLE:
+            logger.error("Vector search dependencies not available")
+    
+    @property
+    def encoder(self) -> "SentenceTransformer":
+        """Embedding model, loaded on first encode so a cached index and cached queries never pay for it"""
+        if self._encoder is None:
+            # Concurrent first queries must not each load their own copy
+            with self._encoder_lock:
+                if self._encoder is None:
+                    logger.info(f"Loading embedding model: {self.embedding_model_name}")
+                    encoder = SentenceTransformer(self.embedding_model_name)
+                    if encoder.device.type == "cuda":
+                        # Half precision roughly doubles GPU encode throughput; FAISS still gets float32
+                        encoder.half()
+                        logger.info("Embedding model running in fp16 on GPU")
+                    self._encoder = encoder
+                    logger.info("Embedding model loaded successfully")
+        return self._encoder
+    
+    def build_index(self, chunks: List) -> Optional[SearchIndex]:
+        """Build a FAISS index over chunks (or load a matching one from disk).
+        
+        Nothing is shared with the indexes already in use, so callers can build
+        a new corpus while queries keep searching the old one.
+        """
+        if not VECTOR_SEARCH_AVAILABLE:
+            logger.error("Cannot build index - dependencies missing")
+            return None
+        
+        # Try loading existing index (only valid if it was built from these chunks)
+        search_index = self._load_index(chunks)
+        if search_index is not None:
+            logger.info("Loaded existing FAISS index from disk")
+            return search_index
+        
+        if not chunks:
+            logger.warning("No chunks available to build index")
+            return None
+        
+        logger.info(f"Creating embeddings for {len(chunks)} chunks")
+        
+        # Create embeddings
+        embeddings = self._embed_chunks([chunk.content for chunk in chunks])
+        logger.info(f"Embeddings created with shape: {embeddings.shape}")
+        
+        # Build FAISS index
+        dimension = embeddings.shape[1]
+        index_type = self._index_type_for(len(embeddings))
+        factory_string = self._factory_string(index_type, len(embeddings), dimension)
+        logger.info(f"Building FAISS index '{factory_string}' with dimension: {dimension}")
+        index = faiss.index_factory(dimension, factory_string, faiss.METRIC_INNER_PRODUCT)
+        hnsw = self._find_hnsw(index)
+        if hnsw is not None:
+            hnsw.efConstruction = self.hnsw_ef_construction
+        if not index.is_trained:
+            logger.info(f"Training index on {len(embeddings)} vectors")
+            index.train(embeddings)
+        index.add(embeddings)
+        self._apply_search_params(index)
+        logger.info(f"FAISS index built with {index.ntotal} vectors")
+        
+        # Save index
+        self._save_index(index, index_type, chunks)
+        index, on_gpu = self._move_to_gpu(index, index_type)
+        return SearchIndex(index, chunks, index_type, on_gpu)
+    
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into normalized float32 embeddings"""
+        # Normalized by the encoder for cosine similarity; only fp16 output needs a float32 copy
+        # encode() sorts texts by length internally, so larger batches add little padding
+        embeddings = self.encoder.encode(
+            texts, 
+            batch_size=256,
+            show_progress_bar=True, 
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _embed_chunks(self, texts: List[str]) -> np.ndarray:
+        """Embed chunk texts, reusing cached embeddings for unchanged content"""
+        if self.embedding_cache is None:
+            return self._encode_texts(texts)
+        
+        keys = [EmbeddingCache.content_key(text) for text in texts]
+        missing = self.embedding_cache.missing_chunks(keys)
+        logger.info(f"Reusing {len(texts) - len(missing)} cached chunk embeddings, encoding {len(missing)}")
+        
+        new_embeddings = {}
+        if missing:
+            encoded = self._encode_texts([texts[i] for i in missing])
+            new_embeddings = {keys[i]: row for i, row in zip(missing, encoded)}
+        
+        embeddings = self.embedding_cache.set_chunks(keys, new_embeddings)
+        self.embedding_cache.save()
+        return embeddings
+    
+    def _index_type_for(self, num_vectors: int) -> str:
+        """Index factory string to use for a corpus size - exact search for small corpora"""
+        if num_vectors < self.min_vectors_for_index:
+            return "Flat"
+        return self.index_type
+    
+    @staticmethod
+    def _factory_string(index_type: str, num_vectors: int, dimension: int) -> str:
+        """Fill {nlist} / {m} placeholders in an index type for this corpus"""
+        return index_type.format(
+            nlist=max(1, int(4 * math.sqrt(num_vectors))),
+            m=max(1, dimension // 4)
+        )
+    
+    @staticmethod
+    def _find_hnsw(index):
+        """Return the HNSW graph of the index (or of the index it wraps), if any"""
+        while index is not None:
+            if hasattr(index, "hnsw"):
+                return index.hnsw
+            base_index = getattr(index, "base_index", None)
+            index = faiss.downcast_index(base_index) if base_index is not None else None
+        return None
+    
+    def _apply_search_params(self, index):
+        """Set IVF probe count, HNSW search breadth and refine depth (no-op for other index types)"""
+        # FP32 re-ranking of quantized candidates ("...,RFlat")
+        if isinstance(index, faiss.IndexRefine):
+            index.k_factor = self.refine_k_factor
+        
+        ivf_index = faiss.try_extract_index_ivf(index)
+        if ivf_index is not None:
+            ivf_index.nprobe = self.nprobe
+        
+        hnsw = self._find_hnsw(index)
+        if hnsw is not None:
+            hnsw.efSearch = self.hnsw_ef_search
+    
+    def _move_to_gpu(self, index, index_type: str) -> Tuple[Any, bool]:
+        """Clone the index onto GPU 0 when enabled (search params are copied with it)"""
+        if not self.use_gpu:
+            return index, False
+        
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            logger.warning("USE_GPU_FAISS is set but no GPU-enabled FAISS/device found - searching on CPU")
+            return index, False
+        
+        try:
+            if self.gpu_resources is None:
+                self.gpu_resources = faiss.StandardGpuResources()
+            gpu_index = faiss.index_cpu_to_gpu(self.gpu_resources, 0, index)
+            logger.info("Moved FAISS index to GPU")
+            return gpu_index, True
+        except Exception as e:
+            # Not every index type has a GPU implementation (HNSW doesn't)
+            logger.warning(f"Index '{index_type}' not supported on GPU, searching on CPU: {e}")
+            return index, False
+    
+    def encode_query(self, query: str) -> Optional[np.ndarray]:
+        """Encode a query into a normalized embedding for search"""
+        if not VECTOR_SEARCH_AVAILABLE:
+            return None
+        
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get_query(query)
+            if cached is not None:
+                return cached
+        
+        # Concurrent callers share one batched encode
+        if self.query_batcher is not None:
+            query_embedding = self.query_batcher.encode(query)
+        else:
+            query_embedding = self.encode_queries([query])
+        
+        if self.embedding_cache is not None:
+            self.embedding_cache.put_query(query, query_embedding)
+        return query_embedding
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode several queries into normalized embeddings in one batch"""
+        query_embeddings = self.encoder.encode(
+            queries,
+            batch_size=len(queries),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True
+        )
+        return np.ascontiguousarray(query_embeddings, dtype=np.float32)
+    
+    def save_caches(self):
+        """Persist cached query embeddings to disk"""
+        if self.embedding_cache is not None:
+            self.embedding_cache.save()
+    
+    def search(
+        self,
+        search_index: Optional[SearchIndex],
+        query: str,
+        top_k: int = 12,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[tuple]:
+        """Search an index for similar chunks (encodes the query unless an embedding is given)"""
+        if not VECTOR_SEARCH_AVAILABLE or search_index is None:
+            logger.warning("Vector search not available")
+            return []
+        
+        try:
+            logger.debug(f"Semantic search for: '{query}' (top_k={top_k})")
+            
+            # Encode query
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+            
+            # Search
+            scores, indices = search_index.index.search(query_embedding, top_k * 2)
+            
+            results = []
+            for score, idx in zip(scores[0], indices[0]):
+                # Approximate indexes pad missing results with -1
+                if 0 <= idx < len(search_index.chunks) and score > 0:
+                    results.append((idx, float(score)))
+            
+            logger.info(f"Semantic search found {len(results)} candidates")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Semantic search error: {e}")
+            return []
+    
+    def _save_index(self, index, index_type: str, chunks: List):
+        """Save a CPU FAISS index and its chunks to disk"""
+        try:
+            # Create data directory if it doesn't exist
+            index_dir = os.path.dirname(self.index_file)
+            if index_dir and not os.path.exists(index_dir):
+                os.makedirs(index_dir)
+                logger.info(f"Created directory: {index_dir}")
+            
+            faiss.write_index(index, self.index_file)
+            logger.info(f"Saved FAISS index to: {self.index_file}")
+            
+            with open(self.chunks_file, 'wb') as f:
+                pickle.dump({"index_type": index_type, "chunks": chunks}, f)
+            logger.info(f"Saved chunks to: {self.chunks_file}")
+        
+        except Exception as e:
+            logger.error(f"Failed to save index: {str(e)}")
+    
+    @staticmethod
+    def _chunk_signature(chunks: List) -> List[tuple]:
+        """Fields that determine a chunk's embedding and position in the index"""
+        return [(chunk.source_file, chunk.chunk_id, chunk.content) for chunk in chunks]
+    
+    def _load_index(self, chunks: List) -> Optional[SearchIndex]:
+        """Load FAISS index and chunks from disk if they match the given chunks"""
+        try:
+            if os.path.exists(self.index_file) and os.path.exists(self.chunks_file):
+                logger.info("Loading existing FAISS index and chunks")
+                with open(self.chunks_file, 'rb') as f:
+                    stored = pickle.load(f)
+                
+                # Older saves hold just the chunk list and were always flat indexes
+                if isinstance(stored, list):
+                    stored = {"index_type": "Flat", "chunks": stored}
+                
+                if self._chunk_signature(stored["chunks"]) != self._chunk_signature(chunks):
+                    logger.info("Documents changed since the index was built - rebuilding")
+                    return None
+                
+                if stored["index_type"] != self._index_type_for(len(chunks)):
+                    logger.info("Index type changed since the index was built - rebuilding")
+                    return None
+                
+                index = faiss.read_index(self.index_file)
+                index_type = stored["index_type"]
+                self._apply_search_params(index)
+                index, on_gpu = self._move_to_gpu(index, index_type)
+                
+                logger.info(f"Loaded {index.ntotal} vectors and {len(chunks)} chunks")
+                return SearchIndex(index, chunks, index_type, on_gpu)
+        
+        except Exception as e:
+            logger.warning(f"Failed to load existing index: {str(e)}")
+        
+        return None
@@ -0,0 +1,754 @@
+"""Redis-based session management for multi-user support"""
+import asyncio
+import redis
+from redis import asyncio as aioredis
+import logging
+import msgspec
+import orjson
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from datetime import datetime
+from .config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_URL, SESSION_EXPIRY_SECONDS,
+    REDIS_MAX_CONNECTIONS, REDIS_SOCKET_TIMEOUT, REDIS_HEALTH_CHECK_INTERVAL,
+    ARCHIVE_FOLDER, ARCHIVE_FORMAT, ARCHIVE_INDEX_KEY, ARCHIVE_INDEX_MAX_ENTRIES
+)
+
+logger = logging.getLogger(__name__)
+
+# Encodes session payloads, including SourceRecord structs, in a single pass
+_json_encoder = msgspec.json.Encoder()
+_json_decoder = msgspec.json.Decoder()
+
+# Key pattern matching one key per session, and the SCAN batch size hint used to enumerate them
+_SESSION_PATTERN = "session:*:meta"
+_SCAN_COUNT = 500
+
+# Sessions used to be a single JSON string at session:{id}; this matches those keys (and newer ones, filtered out)
+_LEGACY_SESSION_PATTERN = "session:*"
+
+# Writes archive files for every sync manager, so managers created again (e.g. on a
+# Streamlit cache reload) don't each leave their own idle worker threads behind
+_archive_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-archive")
+
+# Matches archive filenames, capturing the archive timestamp when present
+_ARCHIVE_NAME_RE = re.compile(r"session_(?:.*_(\d{8}_\d{6})|.*)\.json")
+
+
+class SourceRecord(msgspec.Struct):
+    """Source chunk stored alongside a user message"""
+    content: str
+    source_file: str
+    chunk_id: int
+    relevance_score: float
+    
+    @classmethod
+    def from_chunk(cls, chunk) -> "SourceRecord":
+        """Build a record from a retrieved DocumentChunk"""
+        return cls(chunk.content, chunk.source_file, chunk.chunk_id, chunk.relevance_score)
+
+
+ContextDocs = Optional[List[Union[SourceRecord, Dict]]]
+MessageEntry = Tuple[str, str, ContextDocs]  # (role, content, context_docs)
+
+
+@dataclass(frozen=True)
+class _PipelineOp:
+    """Redis commands to queue on one pipeline and how to turn their replies into a result"""
+    queue: Callable[[Any], Any]
+    decode: Callable[[List[Any]], Any]
+    transaction: bool = True  # MULTI/EXEC only matters when several commands must apply together
+
+
+class BaseSessionManager:
+    """Session layout and archive helpers shared by the sync and async managers"""
+    
+    def __init__(self, expiry: int = SESSION_EXPIRY_SECONDS):
+        self.expiry = expiry
+        self.archive_folder = ARCHIVE_FOLDER
+        
+        # Create archive folder if it doesn't exist
+        os.makedirs(self.archive_folder, exist_ok=True)
+    
+    def _meta_key(self, session_id: str) -> str:
+        """Redis hash holding session metadata (session_id, created_at, last_active)"""
+        return f"session:{session_id}:meta"
+    
+    def _messages_key(self, session_id: str) -> str:
+        """Redis list holding the session's messages, oldest first"""
+        return f"session:{session_id}:msgs"
+    
+    def _context_key(self, session_id: str) -> str:
+        """Redis list parallel to the messages list holding each message's context docs"""
+        return f"session:{session_id}:ctx"
+    
+    def _new_session_data(self, session_id: str) -> Dict[str, Any]:
+        """Build an empty session payload"""
+        now = datetime.now().isoformat()
+        return {
+            "session_id": session_id,
+            "messages": [],
+            "created_at": now,
+            "last_active": now
+        }
+    
+    def _queue_touch(self, pipe, session_id: str):
+        """Queue expiry refreshes for all of a session's keys"""
+        pipe.expire(self._meta_key(session_id), self.expiry)
+        pipe.expire(self._messages_key(session_id), self.expiry)
+        pipe.expire(self._context_key(session_id), self.expiry)
+    
+    def _queue_push(self, pipe, session_id: str, messages: List[Dict[str, Any]]):
+        """Queue pushing messages onto the messages list and their context docs onto the context list"""
+        # Context docs are kept out of the message entries so reading recent context never loads them
+        pipe.rpush(self._messages_key(session_id), *[
+            _json_encoder.encode({k: v for k, v in m.items() if k != "context_docs"}) for m in messages
+        ])
+        pipe.rpush(self._context_key(session_id), *[
+            _json_encoder.encode(m.get("context_docs") or []) for m in messages
+        ])
+    
+    def _queue_write(self, pipe, session_data: Dict[str, Any]):
+        """Queue a full rewrite of a session's metadata and messages"""
+        session_id = session_data["session_id"]
+        pipe.hset(self._meta_key(session_id), mapping={
+            "session_id": session_id,
+            "created_at": session_data["created_at"],
+            "last_active": session_data["last_active"]
+        })
+        pipe.delete(self._messages_key(session_id), self._context_key(session_id))
+        if session_data["messages"]:
+            self._queue_push(pipe, session_id, session_data["messages"])
+        self._queue_touch(pipe, session_id)
+    
+    def _queue_append(self, pipe, session_id: str, messages: List[Dict[str, Any]]):
+        """Queue appending messages, creating the session if it doesn't exist"""
+        meta_key = self._meta_key(session_id)
+        now = datetime.now().isoformat()
+        pipe.hsetnx(meta_key, "session_id", session_id)
+        pipe.hsetnx(meta_key, "created_at", now)
+        pipe.hset(meta_key, "last_active", now)
+        self._queue_push(pipe, session_id, messages)
+        self._queue_touch(pipe, session_id)
+    
+    def _queue_read_messages(self, pipe, session_id: str):
+        """Queue reading all messages and their context docs, refreshing expiry on access"""
+        pipe.lrange(self._messages_key(session_id), 0, -1)
+        pipe.lrange(self._context_key(session_id), 0, -1)
+        self._queue_touch(pipe, session_id)
+    
+    @staticmethod
+    def _decode_messages(
+        raw_messages: List[str],
+        raw_context: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Decode stored messages with one decoder call per list, attaching context docs if given"""
+        if not raw_messages:
+            return []
+        messages = _json_decoder.decode("[" + ",".join(raw_messages) + "]")
+        
+        if raw_context is not None:
+            context_docs = _json_decoder.decode("[" + ",".join(raw_context) + "]")
+            for i, message in enumerate(messages):
+                message["context_docs"] = context_docs[i] if i < len(context_docs) else []
+        return messages
+    
+    def _decode_session(
+        self,
+        meta: Dict[str, str],
+        raw_messages: List[str],
+        raw_context: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Assemble a session payload from its metadata hash and parallel message lists"""
+        if not meta:
+            return None
+        return {
+            "session_id": meta["session_id"],
+            "messages": self._decode_messages(raw_messages, raw_context),
+            "created_at": meta["created_at"],
+            "last_active": meta["last_active"]
+        }
+    
+    @staticmethod
+    def _is_legacy_key(key: str) -> bool:
+        """Whether a key is a pre-hash-layout session:{id} JSON string"""
+        return key.count(":") == 1
+    
+    def _queue_migrate(self, pipe, legacy_key: str, raw: Optional[str]):
+        """Queue rewriting a legacy JSON session into the hash + list layout"""
+        pipe.delete(legacy_key)
+        if raw:
+            session_id = legacy_key[len("session:"):]
+            session_data = {**self._new_session_data(session_id), **_json_decoder.decode(raw)}
+            session_data["session_id"] = session_id
+            self._queue_write(pipe, session_data)
+    
+    def _build_message(
+        self,
+        role: str,
+        content: str,
+        timestamp: str,
+        context_docs: ContextDocs = None
+    ) -> Dict[str, Any]:
+        """Build a message entry for session history"""
+        return {
+            "role": role,
+            "content": content,
+            "timestamp": timestamp,
+            "context_docs": context_docs or []
+        }
+    
+    def _build_messages(self, entries: List[MessageEntry]) -> List[Dict[str, Any]]:
+        """Build message entries that were produced together (they share one timestamp)"""
+        timestamp = datetime.now().isoformat()
+        return [
+            self._build_message(role, content, timestamp, context_docs)
+            for role, content, context_docs in entries
+        ]
+    
+    def _format_context(self, messages: List[Dict[str, Any]], num_exchanges: int) -> str:
+        """Format the most recent exchanges as prompt context"""
+        recent_messages = messages[-(num_exchanges * 2):]
+        
+        context = ""
+        for msg in recent_messages:
+            role = "Human" if msg["role"] == "user" else "Assistant"
+            context += f"{role}: {msg['content']}\n"
+        
+        return context
+    
+    def _write_archive(self, session_id: str, session_data: Dict[str, Any]) -> str:
+        """Write session data to an archive file and return its filename"""
+        # Add end timestamp
+        session_data["ended_at"] = datetime.now().isoformat()
+        
+        # Create filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"session_{session_id[:8]}_{timestamp}.json"
+        filepath = os.path.join(self.archive_folder, filename)
+        
+        # Save to file (indented so archives stay human-readable)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(session_data, option=orjson.OPT_INDENT_2))
+        
+        return filename
+    
+    def _queue_archive_index(self, pipe, entries: Dict[str, float]):
+        """Queue archive index writes on a pipeline, trimming it to the newest entries"""
+        if entries:
+            pipe.zadd(ARCHIVE_INDEX_KEY, entries)
+        if ARCHIVE_INDEX_MAX_ENTRIES:
+            pipe.zremrangebyrank(ARCHIVE_INDEX_KEY, 0, -(ARCHIVE_INDEX_MAX_ENTRIES + 1))
+    
+    @staticmethod
+    def _parse_archive_time(stamp: Optional[str]) -> Optional[float]:
+        """Archive time from a filename timestamp, or None if absent or not a real date"""
+        if not stamp:
+            return None
+        try:
+            return datetime.strptime(stamp, "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            return None
+    
+    def _scan_archive_folder(self) -> Dict[str, float]:
+        """Map archive filenames in the archive folder to their archive times"""
+        entries = {}
+        with os.scandir(self.archive_folder) as it:
+            for entry in it:
+                match = _ARCHIVE_NAME_RE.fullmatch(entry.name)
+                if not match:
+                    continue
+                archived_at = self._parse_archive_time(match.group(1))
+                # A valid timestamp in the filename saves a stat call
+                entries[entry.name] = archived_at if archived_at is not None else entry.stat().st_mtime
+        return entries
+    
+    @staticmethod
+    def _session_id_from_key(meta_key: str) -> str:
+        """Session ID from a session:{id}:meta key"""
+        return meta_key[len("session:"):-len(":meta")]
+    
+    # Each *_op builds the pipeline commands for one public method and decodes their replies;
+    # the sync and async managers only differ in how _run sends the pipeline
+    
+    def _create_session_op(self, session_id: str) -> _PipelineOp:
+        session_data = self._new_session_data(session_id)
+        
+        def decode(results):
+            logger.info(f"Created new session: {session_id}")
+            return session_data
+        
+        return _PipelineOp(lambda pipe: self._queue_write(pipe, session_data), decode)
+    
+    def _get_session_op(self, session_id: str) -> _PipelineOp:
+        # Read and refresh expiry on access in a single round-trip
+        def queue(pipe):
+            pipe.hgetall(self._meta_key(session_id))
+            self._queue_read_messages(pipe, session_id)
+        
+        def decode(results):
+            session_data = self._decode_session(*results[:3])
+            if session_data:
+                logger.debug(f"Retrieved session: {session_id}")
+            else:
+                logger.debug(f"Session not found: {session_id}")
+            return session_data
+        
+        return _PipelineOp(queue, decode)
+    
+    def _update_session_op(self, session_id: str, session_data: Dict[str, Any]) -> _PipelineOp:
+        session_data["last_active"] = datetime.now().isoformat()
+        session_data["session_id"] = session_id
+        
+        def decode(results):
+            logger.debug(f"Updated session: {session_id}")
+            return True
+        
+        return _PipelineOp(lambda pipe: self._queue_write(pipe, session_data), decode)
+    
+    def _index_archive_op(self, filename: str) -> _PipelineOp:
+        # Index the archive by time so listing never touches the disk
+        def decode(results):
+            logger.info(f"📁 Archived session to: {filename}")
+        
+        return _PipelineOp(lambda pipe: self._queue_archive_index(pipe, {filename: time.time()}), decode, transaction=False)
+    
+    def _list_archives_op(self) -> _PipelineOp:
+        return _PipelineOp(lambda pipe: pipe.zrevrange(ARCHIVE_INDEX_KEY, 0, -1), lambda results: results[0], transaction=False)
+    
+    def _rebuild_archive_index_op(self, entries: Dict[str, float]) -> _PipelineOp:
+        # Swap the index atomically so readers never see it empty
+        def queue(pipe):
+            pipe.delete(ARCHIVE_INDEX_KEY)
+            self._queue_archive_index(pipe, entries)
+        
+        def decode(results):
+            logger.debug(f"Rebuilt archive index with {len(entries)} entries")
+            return len(entries)
+        
+        return _PipelineOp(queue, decode)
+    
+    def _migrate_op(self, legacy_key: str, raw: Optional[str]) -> _PipelineOp:
+        return _PipelineOp(lambda pipe: self._queue_migrate(pipe, legacy_key, raw), lambda results: None)
+    
+    def _delete_session_op(self, session_id: str) -> _PipelineOp:
+        def queue(pipe):
+            pipe.delete(self._meta_key(session_id), self._messages_key(session_id), self._context_key(session_id))
+        
+        def decode(results):
+            if results[0]:
+                logger.info(f"🗑️ Deleted session from Redis: {session_id}")
+                return True
+            return False
+        
+        return _PipelineOp(queue, decode, transaction=False)
+    
+    def _session_exists_op(self, session_id: str) -> _PipelineOp:
+        return _PipelineOp(lambda pipe: pipe.exists(self._meta_key(session_id)), lambda results: results[0] > 0, transaction=False)
+    
+    def _add_messages_op(self, session_id: str, entries: List[MessageEntry]) -> _PipelineOp:
+        # RPUSH only sends the new messages - the existing history is never read back
+        messages = self._build_messages(entries)
+        
+        def decode(results):
+            logger.debug(f"Added {len(entries)} messages to session: {session_id}")
+            return True
+        
+        return _PipelineOp(lambda pipe: self._queue_append(pipe, session_id, messages), decode)
+    
+    def _get_messages_op(self, session_id: str) -> _PipelineOp:
+        return _PipelineOp(
+            lambda pipe: self._queue_read_messages(pipe, session_id),
+            lambda results: self._decode_messages(*results[:2])
+        )
+    
+    def _recent_context_op(self, session_id: str, num_exchanges: int) -> _PipelineOp:
+        # Only the last num_exchanges exchanges are fetched
+        def queue(pipe):
+            pipe.lrange(self._messages_key(session_id), -(num_exchanges * 2), -1)
+            self._queue_touch(pipe, session_id)
+        
+        return _PipelineOp(queue, lambda results: self._format_context(self._decode_messages(results[0]), num_exchanges))
+    
+    def _clear_session_op(self, session_id: str) -> _PipelineOp:
+        def queue(pipe):
+            pipe.delete(self._messages_key(session_id), self._context_key(session_id))
+            pipe.hset(self._meta_key(session_id), "last_active", datetime.now().isoformat())
+            self._queue_touch(pipe, session_id)
+        
+        return _PipelineOp(queue, lambda results: True)
+
+
+class SessionManager(BaseSessionManager):
+    """Manages user sessions with Redis"""
+    
+    def __init__(
+        self, 
+        host: str = REDIS_HOST,
+        port: int = REDIS_PORT,
+        db: int = REDIS_DB,
+        expiry: int = SESSION_EXPIRY_SECONDS
+    ):
+        """Initialize Redis connection"""
+        super().__init__(expiry)
+        # Archive writes still in flight on the shared archive pool
+        self._archive_futures = set()
+        
+        try:
+            self.redis_client = redis.Redis(
+                host=host,
+                port=port,
+                db=db,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL
+            )
+            # Test connection
+            self.redis_client.ping()
+            logger.info(f"✅ Connected to Redis at {host}:{port}")
+            logger.info(f"📁 Session archives will be saved to: {self.archive_folder}")
+        except redis.ConnectionError as e:
+            logger.error(f"❌ Failed to connect to Redis: {e}")
+            raise
+    
+    def _run(self, op: _PipelineOp) -> Any:
+        """Send an operation's commands in one round-trip and decode the replies"""
+        pipe = self.redis_client.pipeline(transaction=op.transaction)
+        op.queue(pipe)
+        return op.decode(pipe.execute())
+    
+    def create_session(self, session_id: str) -> Dict[str, Any]:
+        """Create a new session"""
+        return self._run(self._create_session_op(session_id))
+    
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve session data"""
+        return self._run(self._get_session_op(session_id))
+    
+    def update_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
+        """Update session data"""
+        return self._run(self._update_session_op(session_id, session_data))
+    
+    def archive_session(self, session_id: str) -> bool:
+        """Archive session to file before deletion (the file is written in the background)"""
+        session_data = self.get_session(session_id)
+        
+        if not session_data:
+            logger.warning(f"Cannot archive - session not found: {session_id}")
+            return False
+        
+        # The data is already read, so the session can be deleted without waiting on disk I/O
+        future = _archive_pool.submit(self._archive_in_background, session_id, session_data)
+        self._archive_futures.add(future)
+        future.add_done_callback(self._archive_futures.discard)
+        return True
+    
+    def close(self):
+        """Finish pending archive writes, then close the Redis connection"""
+        for future in list(self._archive_futures):
+            future.result()
+        self.redis_client.close()
+        logger.info("Closed Redis connection")
+    
+    def _archive_in_background(self, session_id: str, session_data: Dict[str, Any]):
+        """Write an archive file and index it"""
+        try:
+            self._run(self._index_archive_op(self._write_archive(session_id, session_data)))
+        except Exception as e:
+            logger.error(f"Failed to archive session {session_id}: {e}")
+    
+    def list_archives(self) -> List[str]:
+        """List archived session filenames, most recent first"""
+        return self._run(self._list_archives_op())
+    
+    def migrate_legacy_sessions(self) -> int:
+        """Convert sessions stored as one JSON string to the hash + list layout (call once at startup)"""
+        migrated = 0
+        for key in self.redis_client.scan_iter(match=_LEGACY_SESSION_PATTERN, count=_SCAN_COUNT):
+            if self._is_legacy_key(key):
+                self._run(self._migrate_op(key, self.redis_client.get(key)))
+                migrated += 1
+        
+        if migrated:
+            logger.info(f"Migrated {migrated} legacy sessions to the hash + list layout")
+        return migrated
+    
+    def rebuild_archive_index(self) -> int:
+        """Rebuild the archive index from the archive folder to recover from drift"""
+        return self._run(self._rebuild_archive_index_op(self._scan_archive_folder()))
+    
+    def delete_session(self, session_id: str, archive: bool = True) -> bool:
+        """Delete a session (archives by default before deletion)"""
+        # Archive first if requested
+        if archive:
+            self.archive_session(session_id)
+        return self._run(self._delete_session_op(session_id))
+    
+    def session_exists(self, session_id: str) -> bool:
+        """Check if session exists"""
+        return self._run(self._session_exists_op(session_id))
+    
+    def add_message(
+        self, 
+        session_id: str, 
+        role: str, 
+        content: str,
+        context_docs: ContextDocs = None
+    ) -> bool:
+        """Add a message to session history"""
+        return self.add_messages_bulk(session_id, [(role, content, context_docs)])
+    
+    def add_exchange(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        context_docs: ContextDocs = None
+    ) -> bool:
+        """Add a user message and the assistant reply with a single write"""
+        return self.add_messages_bulk(session_id, [
+            ("user", user_content, context_docs),
+            ("assistant", assistant_content, None)
+        ])
+    
+    def add_messages_bulk(self, session_id: str, entries: List[MessageEntry]) -> bool:
+        """Append several (role, content, context_docs) messages in one round-trip"""
+        return self._run(self._add_messages_op(session_id, entries))
+    
+    def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get all messages for a session"""
+        return self._run(self._get_messages_op(session_id))
+    
+    def get_recent_context(
+        self, 
+        session_id: str, 
+        num_exchanges: int = 2
+    ) -> str:
+        """Get recent conversation context"""
+        return self._run(self._recent_context_op(session_id, num_exchanges))
+    
+    def clear_session(self, session_id: str) -> bool:
+        """Clear session messages but keep session alive"""
+        if not self.session_exists(session_id):
+            return False
+        return self._run(self._clear_session_op(session_id))
+    
+    def get_active_sessions(self) -> List[str]:
+        """Get all active session IDs"""
+        # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS
+        keys = self.redis_client.scan_iter(match=_SESSION_PATTERN, count=_SCAN_COUNT)
+        return [self._session_id_from_key(key) for key in keys]
+    
+    def get_session_count(self) -> int:
+        """Get count of active sessions"""
+        return sum(1 for _ in self.redis_client.scan_iter(match=_SESSION_PATTERN, count=_SCAN_COUNT))
+    
+    def end_session(self, session_id: str) -> bool:
+        """End a session - archives and deletes from Redis"""
+        logger.info(f"Ending session: {session_id}")
+        return self.delete_session(session_id, archive=True)
+
+
+class AsyncSessionManager(BaseSessionManager):
+    """Manages user sessions with the asyncio Redis client (for async API handlers)"""
+    
+    def __init__(
+        self,
+        url: str = REDIS_URL,
+        expiry: int = SESSION_EXPIRY_SECONDS,
+        max_connections: int = REDIS_MAX_CONNECTIONS
+    ):
+        """Create the pooled Redis client - call connect() before first use"""
+        super().__init__(expiry)
+        self.url = url
+        
+        # One bounded pool of keepalive connections shared by all requests;
+        # callers wait for a free connection instead of opening new ones
+        self.pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=5,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL
+        )
+        self.redis_client = aioredis.Redis(connection_pool=self.pool)
+        
+        # Last session count, for cheap health probes
+        self._last_count = 0
+        self._last_count_ts = float("-inf")
+        
+        # Archive writes still in flight (referenced so they aren't garbage collected)
+        self._archive_tasks = set()
+    
+    async def connect(self):
+        """Verify the Redis connection"""
+        try:
+            await self.redis_client.ping()
+            logger.info(f"✅ Connected to Redis at {self.url}")
+            logger.info(f"📁 Session archives will be saved to: {self.archive_folder}")
+        except redis.ConnectionError as e:
+            logger.error(f"❌ Failed to connect to Redis: {e}")
+            raise
+    
+    async def close(self):
+        """Finish pending archive writes, then close all pooled Redis connections"""
+        if self._archive_tasks:
+            await asyncio.gather(*self._archive_tasks, return_exceptions=True)
+        await self.pool.disconnect()
+        logger.info("Closed Redis connection pool")
+    
+    async def _run(self, op: _PipelineOp) -> Any:
+        """Send an operation's commands in one round-trip and decode the replies"""
+        pipe = self.redis_client.pipeline(transaction=op.transaction)
+        op.queue(pipe)
+        return op.decode(await pipe.execute())
+    
+    async def create_session(self, session_id: str) -> Dict[str, Any]:
+        """Create a new session"""
+        return await self._run(self._create_session_op(session_id))
+    
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve session data"""
+        return await self._run(self._get_session_op(session_id))
+    
+    async def update_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
+        """Update session data"""
+        return await self._run(self._update_session_op(session_id, session_data))
+    
+    async def archive_session(self, session_id: str) -> bool:
+        """Archive session to file before deletion (the file is written in the background)"""
+        session_data = await self.get_session(session_id)
+        
+        if not session_data:
+            logger.warning(f"Cannot archive - session not found: {session_id}")
+            return False
+        
+        # The data is already read, so the session can be deleted without waiting on disk I/O
+        task = asyncio.create_task(self._archive_in_background(session_id, session_data))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_tasks.discard)
+        return True
+    
+    async def _archive_in_background(self, session_id: str, session_data: Dict[str, Any]):
+        """Write an archive file and index it"""
+        try:
+            # File write runs in the default executor to keep the event loop free
+            loop = asyncio.get_running_loop()
+            filename = await loop.run_in_executor(None, self._write_archive, session_id, session_data)
+            await self._run(self._index_archive_op(filename))
+        except Exception as e:
+            logger.error(f"Failed to archive session {session_id}: {e}")
+    
+    async def list_archives(self) -> List[str]:
+        """List archived session filenames, most recent first"""
+        return await self._run(self._list_archives_op())
+    
+    async def migrate_legacy_sessions(self) -> int:
+        """Convert sessions stored as one JSON string to the hash + list layout (call once at startup)"""
+        migrated = 0
+        async for key in self.redis_client.scan_iter(match=_LEGACY_SESSION_PATTERN, count=_SCAN_COUNT):
+            if self._is_legacy_key(key):
+                await self._run(self._migrate_op(key, await self.redis_client.get(key)))
+                migrated += 1
+        
+        if migrated:
+            logger.info(f"Migrated {migrated} legacy sessions to the hash + list layout")
+        return migrated
+    
+    async def rebuild_archive_index(self) -> int:
+        """Rebuild the archive index from the archive folder to recover from drift"""
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self._scan_archive_folder)
+        return await self._run(self._rebuild_archive_index_op(entries))
+    
+    async def delete_session(self, session_id: str, archive: bool = True) -> bool:
+        """Delete a session (archives by default before deletion)"""
+        # Archive first if requested
+        if archive:
+            await self.archive_session(session_id)
+        return await self._run(self._delete_session_op(session_id))
+    
+    async def session_exists(self, session_id: str) -> bool:
+        """Check if session exists"""
+        return await self._run(self._session_exists_op(session_id))
+    
+    async def add_message(
+        self, 
+        session_id: str, 
+        role: str, 
+        content: str,
+        context_docs: ContextDocs = None
+    ) -> bool:
+        """Add a message to session history"""
+        return await self.add_messages_bulk(session_id, [(role, content, context_docs)])
+    
+    async def add_exchange(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        context_docs: ContextDocs = None
+    ) -> bool:
+        """Add a user message and the assistant reply with a single write"""
+        return await self.add_messages_bulk(session_id, [
+            ("user", user_content, context_docs),
+            ("assistant", assistant_content, None)
+        ])
+    
+    async def add_messages_bulk(self, session_id: str, entries: List[MessageEntry]) -> bool:
+        """Append several (role, content, context_docs) messages in one round-trip"""
+        return await self._run(self._add_messages_op(session_id, entries))
+    
+    async def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get all messages for a session"""
+        return await self._run(self._get_messages_op(session_id))
+    
+    async def get_recent_context(
+        self, 
+        session_id: str, 
+        num_exchanges: int = 2
+    ) -> str:
+        """Get recent conversation context"""
+        return await self._run(self._recent_context_op(session_id, num_exchanges))
+    
+    async def clear_session(self, session_id: str) -> bool:
+        """Clear session messages but keep session alive"""
+        if not await self.session_exists(session_id):
+            return False
+        return await self._run(self._clear_session_op(session_id))
+    
+    async def get_active_sessions(self) -> List[str]:
+        """Get all active session IDs"""
+        # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS
+        return [
+            self._session_id_from_key(key)
+            async for key in self.redis_client.scan_iter(match=_SESSION_PATTERN, count=_SCAN_COUNT)
+        ]
+    
+    async def get_session_count(self) -> int:
+        """Get count of active sessions"""
+        count = 0
+        async for _ in self.redis_client.scan_iter(match=_SESSION_PATTERN, count=_SCAN_COUNT):
+            count += 1
+        return count
+    
+    async def get_session_count_cached(self, ttl: float = 5) -> int:
+        """Get count of active sessions, reusing the last count for up to ttl seconds"""
+        if time.monotonic() - self._last_count_ts >= ttl:
+            self._last_count = await self.get_session_count()
+            self._last_count_ts = time.monotonic()
+        return self._last_count
+    
+    async def end_session(self, session_id: str) -> bool:
+        """End a session - archives and deletes from Redis"""
+        logger.info(f"Ending session: {session_id}")
+        return await self.delete_session(session_id, archive=True)
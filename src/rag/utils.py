@@ -0,0 +1,135 @@
+"""Utility functions"""
+import re
+import logging
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.warning("pyahocorasick not available - using regex stop-pattern matching")
+
+# Remove artifacts and stop at new questions (case-insensitive patterns)
+STOP_PATTERNS = [
+    "\nHuman:", "\nUser:", "\nAssistant:", "\nAI:", 
+    "Human:", "User:", "Assistant:", "AI:", "ASSISTANT RESPONSE",
+    "\nUSER QUESTION", "\nANSWER:", "\nDOCUMENTATION:",
+    "\nYOUR RESPONSE", "\nUSER QUESTIONS",
+    "USER QUESTION (", "USER QUESTIONS (",
+    "\n\nHow do", "\n\nWhat is", "\n\nCan I", "\n\nWhere can",
+    "\n\nHow to", "\n\nWhat are", "\n\nCan you", "\n\nWhere do",
+    "\n\nIs there", "\n\nAre there",
+    "\nRemember,", "\n\nRemember,",  # Often precedes examples
+    "what if i", "what if you",  # Follow-up question patterns
+]
+
+# Single-pass matcher for all stop patterns (regex alternation if pyahocorasick is missing)
+if AHOCORASICK_AVAILABLE:
+    _STOP_AUTOMATON = ahocorasick.Automaton()
+    for _pattern in STOP_PATTERNS:
+        _STOP_AUTOMATON.add_word(_pattern.lower(), len(_pattern))
+    _STOP_AUTOMATON.make_automaton()
+else:
+    _STOP_RE = re.compile("|".join(re.escape(p) for p in STOP_PATTERNS), re.IGNORECASE)
+
+_STOP_MAX_LEN = max(len(p) for p in STOP_PATTERNS)
+
+_WS_RE = re.compile(r'\s+')
+
+
+def _find_stop_pattern(response: str, start: int = 0) -> int:
+    """Return the position of the earliest stop pattern in response[start:], or -1"""
+    if not AHOCORASICK_AVAILABLE:
+        match = _STOP_RE.search(response, start)
+        return match.start() if match else -1
+    
+    best = -1
+    for end, length in _STOP_AUTOMATON.iter(response[start:].lower()):
+        # Matches arrive by end position; nothing later can start before best
+        if best != -1 and start + end - _STOP_MAX_LEN >= best:
+            break
+        pos = start + end - length + 1
+        if best == -1 or pos < best:
+            best = pos
+            if best == start:
+                break
+    return best
+
+
+def clean_response(response: str) -> str:
+    """Clean up generated response"""
+    if not response:
+        return "I'm here to help! What would you like to know about FlowHCM?"
+    
+    pos = _find_stop_pattern(response)
+    if pos != -1:
+        response = response[:pos]
+    
+    # Remove repeated whitespace
+    response = _WS_RE.sub(' ', response).strip()
+    
+    # Remove incomplete sentences at the end
+    if response and response[-1] not in '.!?':
+        sentences = response.split('.')
+        if len(sentences) > 1:
+            response = '.'.join(sentences[:-1]) + '.'
+    
+    return response
+
+
+def clean_response_stream(pieces: Iterable[str]) -> Iterator[str]:
+    """Incremental clean_response: yields cleaned text as sentences complete.
+    
+    The yielded text joins to exactly clean_response() of the whole output,
+    so what streams to the user is what gets stored.
+    """
+    raw = ""
+    received = False
+    scanned = 0  # No stop pattern starts before this position
+    consumed = 0  # raw[:consumed] has been cleaned and yielded
+    emitted = 0  # Length of the cleaned text yielded so far
+    
+    try:
+        for piece in pieces:
+            if not piece:
+                continue
+            received = True
+            raw += piece
+            
+            pos = _find_stop_pattern(raw, scanned)
+            if pos != -1:
+                raw = raw[:pos]
+                break
+            scanned = max(scanned, len(raw) - _STOP_MAX_LEN + 1)
+            
+            # Text after the last '.' may still be dropped as an incomplete sentence
+            cut = raw.rfind('.', consumed, scanned) + 1
+            if cut > consumed:
+                text = _WS_RE.sub(' ', raw[consumed:cut])
+                if not emitted:
+                    text = text.lstrip()
+                consumed = cut
+                if text:
+                    emitted += len(text)
+                    yield text
+    finally:
+        # Stop the upstream generator (and its HTTP stream) early on a stop pattern
+        close = getattr(pieces, "close", None)
+        if close is not None:
+            close()
+    
+    cleaned = clean_response(raw) if raw or not received else ""
+    if len(cleaned) > emitted:
+        yield cleaned[emitted:]
+
+
+def setup_logging(log_level: str = "INFO"):
+    """Setup logging configuration"""
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
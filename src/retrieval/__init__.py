@@ -1,5 +0,0 @@
-"""Retrieval components"""
-from .vector_store import VectorStore
-from .retriever import SemanticRetriever
-
-__all__ = ["VectorStore", "SemanticRetriever"]
@@ -0,0 +1,64 @@
+"""/query handling of the Redis LLM cache, with the RAG system and Redis stubbed out"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+pytest.importorskip("sentence_transformers")
+
+from apps import api
+
+
+class StubRAGSystem:
+    corpus_version = "v1"
+
+    def __init__(self, response, failed):
+        self.result = (response, [], failed)
+
+    def embed_query(self, query):
+        return None
+
+    def query_with_context(self, query, recent_context, **kwargs):
+        return self.result
+
+
+class StubSessionManager:
+    def __init__(self):
+        self.exchanges = []
+
+    async def get_recent_context(self, session_id, num_exchanges):
+        return ""
+
+    async def add_exchange(self, session_id, user_content, assistant_content, context_docs=None):
+        self.exchanges.append((user_content, assistant_content))
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Responses written to the LLM cache by /query"""
+    stored = []
+    monkeypatch.setattr(api, "llm_cache", object())
+    monkeypatch.setattr(api, "session_manager", StubSessionManager())
+    monkeypatch.setattr(api, "lookup_cached_response", lambda *args: None)
+    monkeypatch.setattr(api, "store_cached_response", lambda query, scope, response, *args: stored.append(response))
+    return stored
+
+
+def run_query(monkeypatch, response, failed):
+    monkeypatch.setattr(api, "rag_system", StubRAGSystem(response, failed))
+    return asyncio.run(api.query(api.QueryRequest(session_id="s1", query="How do I apply?")))
+
+
+def test_successful_reply_is_stored(monkeypatch, stored):
+    result = run_query(monkeypatch, "Open the Leave tab.", failed=False)
+    assert result.response == "Open the Leave tab."
+    assert stored == ["Open the Leave tab."]
+
+
+def test_error_reply_is_not_stored(monkeypatch, stored):
+    result = run_query(monkeypatch, "I apologize, but the request timed out. Please try again.", failed=True)
+    # The user still gets the error reply; it just isn't replayed to later queries
+    assert result.response.startswith("I apologize")
+    assert stored == []
+    assert api.session_manager.exchanges
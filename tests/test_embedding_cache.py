@@ -0,0 +1,47 @@
+"""Content-hash cache of query and chunk embeddings"""
+import numpy as np
+
+from rag.retrieval.embedding_cache import EmbeddingCache
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.array([values], dtype="float32")
+    return vector / np.linalg.norm(vector)
+
+
+def test_query_embeddings_are_keyed_by_normalized_text_and_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.pkl"), "model-a", max_queries=2)
+    batch = np.arange(6, dtype="float32").reshape(3, 2)
+    for i, query in enumerate(["one", "two", "three"]):
+        cache.put_query(query, batch[i:i + 1])
+
+    assert cache.get_query("one") is None
+    np.testing.assert_array_equal(cache.get_query("  THREE "), batch[2:3])
+    # Stored rows are copies, not views into the batch
+    batch[:] = 0
+    assert cache.get_query("three").any()
+
+
+def test_chunk_embeddings_track_current_corpus(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.pkl"), "model-a")
+    keys = [EmbeddingCache.content_key(text) for text in ["a", "b"]]
+    assert cache.missing_chunks(keys) == [0, 1]
+
+    matrix = cache.set_chunks(keys, {keys[0]: np.ones(2, "float32"), keys[1]: np.zeros(2, "float32")})
+    assert matrix.shape == (2, 2)
+    assert cache.missing_chunks(keys) == []
+
+    # Only chunks of the new corpus are kept
+    new_key = EmbeddingCache.content_key("c")
+    cache.set_chunks([keys[1], new_key], {new_key: np.full(2, 2, "float32")})
+    assert set(cache.chunks) == {keys[1], new_key}
+
+
+def test_embedding_cache_round_trip(tmp_path):
+    path = str(tmp_path / "embeddings.pkl")
+    cache = EmbeddingCache(path, "model-a")
+    cache.put_query("hello", unit(1, 1))
+    cache.save()
+
+    np.testing.assert_allclose(EmbeddingCache(path, "model-a").get_query("hello"), unit(1, 1))
+    assert EmbeddingCache(path, "model-b").get_query("hello") is None
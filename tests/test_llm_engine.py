@@ -0,0 +1,182 @@
+"""Stop-string handling in the Ollama engine, batch and streaming"""
+import random
+import re
+
+import orjson
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from rag.generation import llm_engine
+from rag.generation.llm_engine import LLMEngine, StreamStatus, STOP_STRINGS
+
+# Reference matcher, independent of the engine's automaton
+STOP_RE = re.compile("|".join(re.escape(s) for s in STOP_STRINGS))
+
+
+class FakeResponse:
+    """Streaming /api/generate response yielding one JSON line per token"""
+
+    def __init__(self, tokens, done=True, status_code=200, fail_after=None):
+        self.status_code = status_code
+        self.lines = [orjson.dumps({"response": token, "done": False}) for token in tokens]
+        if done:
+            self.lines.append(orjson.dumps({"response": "", "done": True}))
+        self.fail_after = fail_after
+        self.consumed = 0
+
+    def iter_lines(self):
+        for line in self.lines:
+            if self.consumed == self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection broken")
+            self.consumed += 1
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.payloads = []
+
+    def post(self, url, json=None, **kwargs):
+        self.payloads.append(json)
+        return self.response
+
+
+def make_engine(response) -> LLMEngine:
+    engine = LLMEngine("test-model", "http://ollama.test")
+    engine.session = FakeSession(response)
+    return engine
+
+
+def expected_output(tokens) -> str:
+    """What the stream should yield: the text up to the first stop string"""
+    text = "".join(tokens).lstrip()
+    match = STOP_RE.search(text)
+    return text[:match.start()].rstrip() if match else text
+
+
+def stream(tokens, done=True) -> list:
+    return list(make_engine(FakeResponse(tokens, done)).generate_stream("prompt"))
+
+
+def test_stop_string_split_across_tokens_is_never_emitted():
+    tokens = ["Use the Leave tab.", " USER QUE", "STION: how do I"]
+    pieces = stream(tokens)
+    assert "".join(pieces) == "Use the Leave tab."
+    assert not any("USER" in piece for piece in pieces)
+
+
+def test_stop_string_at_token_boundary():
+    tokens = ["Submit the form.\n", "\nHow do", " I cancel?"]
+    assert "".join(stream(tokens)) == "Submit the form."
+
+
+def test_stream_stops_reading_after_stop_string():
+    response = FakeResponse(["Done. ", "ANSWER:", " more", " text"])
+    assert "".join(make_engine(response).generate_stream("prompt")) == "Done."
+    assert response.consumed == 2
+
+
+def test_held_back_tail_is_flushed_without_done_marker():
+    tokens = ["Short answer", " ends here  "]
+    assert "".join(stream(tokens, done=False)) == "Short answer ends here"
+
+
+def test_random_token_splits_match_reference():
+    rng = random.Random(7)
+    words = ["Open", " the", " portal", ".", " ", "\n", "\n\n", "What is", "How do",
+             "USER", " QUESTION", "QUEST", "ION", "ANSWER", ":", "Remember,", "what if i"]
+    for _ in range(2000):
+        text = "".join(rng.choice(words) for _ in range(rng.randint(1, 25)))
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 8))))
+        bounds = [0] + cuts + [len(text)]
+        tokens = [text[start:end] for start, end in zip(bounds, bounds[1:])]
+        assert "".join(stream(tokens)) == expected_output(tokens), tokens
+
+
+def test_find_stop_matches_regex_fallback(monkeypatch):
+    rng = random.Random(3)
+    texts = ["".join(rng.choice(["a", " ", "QUESTION", "USER ", "\n\nIs there", "what if you"])
+                     for _ in range(20)) for _ in range(300)]
+    expected = [LLMEngine._find_stop(text) for text in texts]
+
+    monkeypatch.setattr(llm_engine, "AHOCORASICK_AVAILABLE", False)
+    monkeypatch.setattr(llm_engine, "_STOP_RE", STOP_RE, raising=False)
+    assert [LLMEngine._find_stop(text) for text in texts] == expected
+
+
+def test_error_status_yields_error_reply():
+    pieces = list(make_engine(FakeResponse([], status_code=500)).generate_stream("prompt"))
+    assert pieces and pieces[0].startswith(llm_engine.LLM_ERROR_PREFIX)
+
+
+def test_error_status_marks_stream_failed():
+    status = StreamStatus()
+    list(make_engine(FakeResponse([], status_code=500)).generate_stream("prompt", status=status))
+    assert status.failed
+
+
+def test_stream_dying_mid_response_marks_it_failed():
+    status = StreamStatus()
+    engine = make_engine(FakeResponse(["Open the Leave tab. ", "Then pick the dates", " and submit."], fail_after=2))
+    pieces = list(engine.generate_stream("prompt", status=status))
+
+    # Partial output is followed by the error reply, so the joined text doesn't start with it
+    assert "".join(pieces).startswith("Open the Leave tab.")
+    assert pieces[-1].startswith(llm_engine.LLM_ERROR_PREFIX)
+    assert status.failed
+
+
+def test_complete_stream_is_not_failed():
+    status = StreamStatus()
+    list(make_engine(FakeResponse(["All good."])).generate_stream("prompt", status=status))
+    assert not status.failed
+
+
+class WarmUpResponse:
+    status_code = 200
+
+    def __init__(self, **fields):
+        self.content = orjson.dumps({"response": "", "done": True, **fields})
+
+
+def warm_up(response, prefix="You are a helpful assistant.") -> LLMEngine:
+    engine = LLMEngine("test-model", "http://ollama.test", prompt_prefix=prefix)
+    engine.session = FakeSession(response)
+    engine._warm_up()
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def fresh_prefix_counts(monkeypatch):
+    monkeypatch.setattr(llm_engine, "_PREFIX_TOKENS", {})
+
+
+def test_warm_up_counts_the_raw_prefix():
+    engine = warm_up(WarmUpResponse(prompt_eval_count=412))
+    count_payload, prime_payload = engine.session.payloads
+
+    assert count_payload["raw"] and count_payload["prompt"] == "You are a helpful assistant."
+    assert "raw" not in prime_payload
+    assert engine.num_keep == 412
+    assert engine._build_payload("p", 10, 0.1, 0.9, 40, 1.1, stream=True)["options"]["num_keep"] == 412
+
+
+def test_cached_prefix_keeps_the_earlier_count():
+    warm_up(WarmUpResponse(prompt_eval_count=412))
+    # Once the prefix sits in Ollama's KV cache the field is ~1 or missing
+    assert warm_up(WarmUpResponse(prompt_eval_count=1)).num_keep == 412
+    assert warm_up(WarmUpResponse()).num_keep == 412
+
+
+def test_no_usable_count_leaves_num_keep_unset():
+    engine = warm_up(WarmUpResponse(prompt_eval_count=1))
+    assert engine.num_keep == 0
+    assert "num_keep" not in engine._build_payload("p", 10, 0.1, 0.9, 40, 1.1, stream=True)["options"]
@@ -0,0 +1,63 @@
+"""Micro-batching of concurrent query encodes"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from rag.retrieval.query_batcher import QueryBatcher
+
+
+class RecordingEncoder:
+    """Encodes each query as [len(query), index] and records batch sizes"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, queries):
+        self.batches.append(len(queries))
+        time.sleep(self.delay)
+        return np.array([[len(q), i] for i, q in enumerate(queries)], dtype="float32")
+
+
+def test_lone_query_does_not_wait_for_a_batch():
+    encoder = RecordingEncoder()
+    batcher = QueryBatcher(encoder, max_batch=8, max_wait=1.0)
+
+    start = time.monotonic()
+    embedding = batcher.encode("hello")
+    assert time.monotonic() - start < 0.5
+    assert embedding.shape == (1, 2)
+    assert embedding[0, 0] == 5
+    assert encoder.batches == [1]
+
+
+def test_concurrent_queries_share_batches_and_get_their_own_rows():
+    # A slow encode lets requests pile up behind the first one
+    encoder = RecordingEncoder(delay=0.05)
+    batcher = QueryBatcher(encoder, max_batch=8, max_wait=0.01)
+    queries = ["q" * n for n in range(1, 25)]
+
+    with ThreadPoolExecutor(max_workers=24) as pool:
+        results = list(pool.map(batcher.encode, queries))
+
+    assert [int(r[0, 0]) for r in results] == [len(q) for q in queries]
+    assert sum(encoder.batches) == len(queries)
+    assert max(encoder.batches) <= 8
+    assert len(encoder.batches) < len(queries)
+
+
+def test_encode_errors_reach_every_caller():
+    def failing(queries):
+        raise RuntimeError("encoder offline")
+
+    batcher = QueryBatcher(failing, max_batch=4, max_wait=0.0)
+    with pytest.raises(RuntimeError, match="encoder offline"):
+        batcher.encode("hello")
+
+    # The worker survives a failed batch and fails whole batches together
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(batcher.encode, "x") for _ in range(3)]
+    for future in futures:
+        assert isinstance(future.exception(timeout=5), RuntimeError)
@@ -0,0 +1,71 @@
+"""Query paths of RAGSystem with the engine, retriever and encoder stubbed out"""
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("requests")
+
+from rag.generation.semantic_cache import SemanticCache
+from rag.rag_system import Corpus, RAGSystem
+
+EMBEDDING = np.array([[1.0, 0.0]], dtype="float32")
+
+
+class NoResultsRetriever:
+    def retrieve(self, query, top_k, query_embedding=None):
+        return []
+
+
+class ScriptedEngine:
+    """Yields the given pieces, then optionally fails the way LLMEngine does"""
+
+    def __init__(self, pieces, fail=False):
+        self.pieces = pieces
+        self.fail = fail
+
+    def generate_stream(self, prompt, max_tokens=300, temperature=0.3, top_p=0.85, status=None):
+        yield from self.pieces
+        if self.fail:
+            status.failed = True
+            yield " I apologize, but I encountered an error: connection broken"
+
+
+def make_system(tmp_path, engine) -> RAGSystem:
+    system = RAGSystem.__new__(RAGSystem)
+    system.corpus = Corpus([{"name": "doc"}], [], "v1", NoResultsRetriever())
+    system.response_cache = SemanticCache(str(tmp_path / "responses.pkl"), "model-a")
+    system.llm_engine = engine
+    system.messages = []
+    return system
+
+
+def test_successful_reply_is_cached(tmp_path):
+    system = make_system(tmp_path, ScriptedEngine(["Open the Leave tab."]))
+    response, _, failed = system.query_with_context("How do I apply?", query_embedding=EMBEDDING)
+
+    assert response == "Open the Leave tab."
+    assert not failed
+    assert len(system.response_cache.exact) == 1
+
+
+def test_reply_that_fails_mid_stream_is_not_cached(tmp_path):
+    system = make_system(tmp_path, ScriptedEngine(["Open the Leave tab.", " Then"], fail=True))
+    response, _, failed = system.query_with_context("How do I apply?", query_embedding=EMBEDDING)
+
+    assert response.startswith("Open the Leave tab.")
+    assert failed
+    assert len(system.response_cache.exact) == 0
+
+
+def test_pipeline_error_is_flagged(tmp_path):
+    class BrokenRetriever:
+        def retrieve(self, query, top_k, query_embedding=None):
+            raise RuntimeError("index unavailable")
+
+    system = make_system(tmp_path, ScriptedEngine(["unused"]))
+    system.corpus = Corpus([{"name": "doc"}], [], "v1", BrokenRetriever())
+    response, sources, failed = system.query_with_context("How do I apply?", query_embedding=EMBEDDING)
+
+    assert failed
+    assert sources == []
+    assert len(system.response_cache.exact) == 0
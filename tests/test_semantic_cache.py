@@ -0,0 +1,58 @@
+"""Embedding-similarity cache of generated responses"""
+import numpy as np
+import pytest
+
+from rag.generation import semantic_cache
+from rag.generation.semantic_cache import SemanticCache
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.array([values], dtype="float32")
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    return SemanticCache(str(tmp_path / "responses.pkl"), "model-a", threshold=0.95, max_entries=10)
+
+
+def test_context_key_covers_all_params():
+    key = SemanticCache.context_key("Human: hi\n", "corpus-1", 300, 0.3, 0.85)
+    assert key == SemanticCache.context_key("Human: hi\n", "corpus-1", 300, 0.3, 0.85)
+    assert key != SemanticCache.context_key("Human: hi\n", "corpus-2", 300, 0.3, 0.85)
+    assert key != SemanticCache.context_key("", "corpus-1", 300, 0.3, 0.85)
+
+
+def test_exact_hit_ignores_surrounding_whitespace(response_cache):
+    response_cache.insert("How do I apply?", None, "ctx", "Use the portal.", ["doc"])
+    assert response_cache.lookup_exact("  How do I apply? ", "ctx") == ("Use the portal.", ["doc"])
+    assert response_cache.lookup_exact("How do I apply?", "other") is None
+
+
+@pytest.mark.skipif(not semantic_cache.FAISS_AVAILABLE, reason="faiss not installed")
+def test_semantic_hit_needs_similarity_and_matching_context(response_cache):
+    response_cache.insert("How do I apply?", unit(1, 0, 0), "ctx", "Use the portal.", [])
+
+    assert response_cache.lookup(unit(1, 0.05, 0), "ctx") == ("Use the portal.", [])
+    assert response_cache.lookup(unit(1, 0.05, 0), "other") is None
+    assert response_cache.lookup(unit(0, 1, 0), "ctx") is None
+
+
+@pytest.mark.skipif(not semantic_cache.FAISS_AVAILABLE, reason="faiss not installed")
+def test_oldest_entries_are_trimmed(response_cache):
+    for i in range(12):
+        response_cache.insert(f"q{i}", unit(1, i, 0), "ctx", f"a{i}", [])
+
+    assert len(response_cache.exact) == 10
+    assert response_cache.lookup_exact("q0", "ctx") is None
+    assert len(response_cache.entries) == response_cache.index.ntotal <= 10
+
+
+def test_response_cache_persists_per_model(tmp_path):
+    path = str(tmp_path / "responses.pkl")
+    cache = SemanticCache(path, "model-a")
+    cache.insert("q", unit(1, 0), "ctx", "a", [])
+    cache.save()
+
+    assert SemanticCache(path, "model-a").lookup_exact("q", "ctx") == ("a", [])
+    assert SemanticCache(path, "model-b").lookup_exact("q", "ctx") is None
@@ -0,0 +1,207 @@
+"""Session managers against an in-memory Redis"""
+import asyncio
+import os
+
+import orjson
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from rag import session_manager as sm
+from rag.session_manager import SourceRecord
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    """Point session archives at a temporary folder"""
+    monkeypatch.setattr(sm, "ARCHIVE_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def manager(archive_dir, monkeypatch):
+    """SessionManager backed by fakeredis"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        sm.redis, "Redis", lambda **kwargs: fakeredis.FakeRedis(server=server, decode_responses=True)
+    )
+    manager = sm.SessionManager()
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def async_manager(archive_dir):
+    """AsyncSessionManager backed by fakeredis"""
+    manager = sm.AsyncSessionManager()
+    manager.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return manager
+
+
+SOURCES = [SourceRecord(content="Leave requests...", source_file="leave.docx", chunk_id=3, relevance_score=0.82)]
+
+
+def test_exchange_round_trip(manager):
+    manager.create_session("s1")
+    manager.add_exchange("s1", "How do I apply for leave?", "Open the Leave tab.", SOURCES)
+
+    messages = manager.get_messages("s1")
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert messages[0]["content"] == "How do I apply for leave?"
+    assert messages[0]["context_docs"] == [
+        {"content": "Leave requests...", "source_file": "leave.docx", "chunk_id": 3, "relevance_score": 0.82}
+    ]
+    assert messages[1]["context_docs"] == []
+    assert manager.get_session("s1")["messages"] == messages
+
+
+def test_add_message_creates_session(manager):
+    assert not manager.session_exists("s1")
+    manager.add_message("s1", "user", "hello")
+    assert manager.session_exists("s1")
+    assert manager.get_session_count() == 1
+    assert manager.get_active_sessions() == ["s1"]
+
+
+def test_recent_context_only_reads_last_exchanges(manager):
+    for i in range(4):
+        manager.add_exchange("s1", f"q{i}", f"a{i}")
+
+    assert manager.get_recent_context("s1", num_exchanges=2) == (
+        "Human: q2\nAssistant: a2\nHuman: q3\nAssistant: a3\n"
+    )
+
+
+def test_update_session_rewrites_messages(manager):
+    session = manager.create_session("s1")
+    session["messages"] = [{"role": "user", "content": "hi", "timestamp": "t", "context_docs": []}]
+    manager.update_session("s1", session)
+
+    assert manager.get_messages("s1") == session["messages"]
+
+
+def test_clear_session_keeps_session(manager):
+    manager.add_exchange("s1", "q", "a")
+    assert manager.clear_session("s1")
+    assert manager.session_exists("s1")
+    assert manager.get_messages("s1") == []
+    assert not manager.clear_session("missing")
+
+
+def test_keys_expire(manager):
+    manager.add_message("s1", "user", "hello")
+    for key in ("session:s1:meta", "session:s1:msgs", "session:s1:ctx"):
+        assert 0 < manager.redis_client.ttl(key) <= manager.expiry
+
+
+def test_end_session_archives_and_deletes(manager, archive_dir):
+    manager.add_exchange("s1", "q", "a", SOURCES)
+    assert manager.end_session("s1")
+    # close() waits for the background archive write
+    manager.close()
+
+    assert not manager.session_exists("s1")
+    archives = manager.list_archives()
+    assert len(archives) == 1
+    archived = orjson.loads((archive_dir / archives[0]).read_bytes())
+    assert archived["session_id"] == "s1"
+    assert [m["content"] for m in archived["messages"]] == ["q", "a"]
+
+
+def test_rebuild_archive_index_from_folder(manager, archive_dir):
+    (archive_dir / "session_old_20240101_120000.json").write_bytes(b"{}")
+    (archive_dir / "notes.txt").write_bytes(b"")
+    assert manager.rebuild_archive_index() == 1
+    assert manager.list_archives() == ["session_old_20240101_120000.json"]
+
+
+def test_invalid_archive_timestamp_falls_back_to_mtime(manager, archive_dir):
+    bad = archive_dir / "session_x_20261399_000000.json"
+    bad.write_bytes(b"{}")
+    os.utime(bad, (1_700_000_000, 1_700_000_000))
+    (archive_dir / "session_plain.json").write_bytes(b"{}")
+
+    assert manager.rebuild_archive_index() == 2
+    assert manager.redis_client.zscore(sm.ARCHIVE_INDEX_KEY, bad.name) == 1_700_000_000
+
+
+def test_delete_without_archive(manager, archive_dir):
+    manager.add_message("s1", "user", "hello")
+    assert manager.delete_session("s1", archive=False)
+    manager.close()
+    assert os.listdir(archive_dir) == []
+    assert not manager.delete_session("s1", archive=False)
+
+
+def test_legacy_json_sessions_are_migrated(manager):
+    legacy = {
+        "session_id": "old",
+        "messages": [
+            {"role": "user", "content": "q", "timestamp": "t", "context_docs": [{"source_file": "a.docx"}]},
+            {"role": "assistant", "content": "a", "timestamp": "t", "context_docs": []},
+        ],
+        "created_at": "2026-01-01T00:00:00",
+        "last_active": "2026-01-01T00:05:00",
+    }
+    manager.redis_client.set("session:old", orjson.dumps(legacy), ex=60)
+    manager.add_message("new", "user", "hello")
+
+    assert manager.migrate_legacy_sessions() == 1
+    assert not manager.redis_client.exists("session:old")
+    assert sorted(manager.get_active_sessions()) == ["new", "old"]
+    session = manager.get_session("old")
+    assert session["created_at"] == "2026-01-01T00:00:00"
+    assert session["messages"] == legacy["messages"]
+    # Nothing left to migrate, and current-layout keys are untouched
+    assert manager.migrate_legacy_sessions() == 0
+    assert manager.get_messages("new")[0]["content"] == "hello"
+
+
+def test_async_manager_round_trip(async_manager):
+    async def scenario():
+        await async_manager.create_session("s1")
+        await async_manager.add_exchange("s1", "q0", "a0", SOURCES)
+        await async_manager.add_exchange("s1", "q1", "a1")
+
+        messages = await async_manager.get_messages("s1")
+        assert [m["content"] for m in messages] == ["q0", "a0", "q1", "a1"]
+        assert messages[0]["context_docs"][0]["source_file"] == "leave.docx"
+        assert await async_manager.get_recent_context("s1", num_exchanges=1) == "Human: q1\nAssistant: a1\n"
+        assert await async_manager.get_session_count() == 1
+        assert await async_manager.get_active_sessions() == ["s1"]
+
+        assert await async_manager.clear_session("s1")
+        assert await async_manager.get_messages("s1") == []
+        assert not await async_manager.clear_session("missing")
+
+    asyncio.run(scenario())
+
+
+def test_async_end_session_archives(async_manager, archive_dir):
+    async def scenario():
+        await async_manager.add_exchange("s1", "q", "a")
+        assert await async_manager.end_session("s1")
+        # close() waits for the background archive write
+        await async_manager.close()
+
+        assert not await async_manager.session_exists("s1")
+        assert await async_manager.rebuild_archive_index() == 1
+        return await async_manager.list_archives()
+
+    archives = asyncio.run(scenario())
+    assert len(archives) == 1
+    assert (archive_dir / archives[0]).exists()
+
+
+def test_async_legacy_sessions_are_migrated(async_manager):
+    legacy = {"session_id": "old", "messages": [{"role": "user", "content": "q", "timestamp": "t"}]}
+
+    async def scenario():
+        await async_manager.redis_client.set("session:old", orjson.dumps(legacy), ex=60)
+        assert await async_manager.migrate_legacy_sessions() == 1
+        assert await async_manager.migrate_legacy_sessions() == 0
+        return await async_manager.get_session("old")
+
+    session = asyncio.run(scenario())
+    assert session["messages"][0]["content"] == "q"
+    assert session["messages"][0]["context_docs"] == []
@@ -0,0 +1,82 @@
+"""Response cleaning, batch and streaming"""
+import random
+
+import pytest
+
+from rag import utils
+from rag.utils import clean_response, clean_response_stream
+
+# Fragments that exercise sentence ends, whitespace runs and stop patterns (in mixed case)
+FRAGMENTS = [
+    "Open the Leave tab", ".", " ", "  ", "\n", "\n\n", "Submit it", "!", "?",
+    "Approvals follow", "Human:", "user:", "ASSISTANT RESPONSE", "\nRemember,",
+    "\n\nHow do", "What if I", "e.g", "v2.1", "AI", ":",
+]
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+
+
+def random_split(rng: random.Random, text: str) -> list:
+    """Split text at random points, including empty pieces and single characters"""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, len(text) + 1)))
+    bounds = [0] + cuts + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_stream_joins_to_clean_response():
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = random_text(rng)
+        pieces = random_split(rng, text)
+        assert "".join(clean_response_stream(iter(pieces))) == clean_response(text), pieces
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "No sentence end",
+    "One. Two. Thr",
+    "   Leading spaces.  Trailing  ",
+    "Answer first.\nUser: next question",
+    "Stops immediately Human: yes.",
+    "Done.\n\nHow do I reset it?",
+])
+def test_single_piece_matches_clean_response(text):
+    assert "".join(clean_response_stream([text])) == clean_response(text)
+
+
+def test_stop_pattern_split_across_pieces():
+    pieces = ["Use the portal.", " Then wait.\nUs", "er: what", " now?"]
+    assert "".join(clean_response_stream(iter(pieces))) == "Use the portal. Then wait."
+
+
+def test_stream_closes_upstream_on_stop():
+    closed = []
+
+    def upstream():
+        try:
+            yield "First answer."
+            yield " Human: follow-up"
+            yield " never reached."
+        finally:
+            closed.append(True)
+
+    assert "".join(clean_response_stream(upstream())) == "First answer."
+    assert closed == [True]
+
+
+def test_regex_fallback_matches_automaton(monkeypatch):
+    if not utils.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    rng = random.Random(99)
+    texts = [random_text(rng) for _ in range(500)]
+    expected = [utils._find_stop_pattern(text) for text in texts]
+
+    monkeypatch.setattr(utils, "AHOCORASICK_AVAILABLE", False)
+    monkeypatch.setattr(
+        utils, "_STOP_RE",
+        utils.re.compile("|".join(utils.re.escape(p) for p in utils.STOP_PATTERNS), utils.re.IGNORECASE),
+        raising=False
+    )
+    assert [utils._find_stop_pattern(text) for text in texts] == expected